@@ -12,12 +12,15 @@ Author: David Caleb Chaparro Orozco
 """
 
 import os
+import re
+import zlib
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 import plotly.express as px
 import sqlite3
+import time
 from IPython.display import display
 import warnings
 warnings.filterwarnings("ignore")
@@ -27,6 +30,71 @@ BACKGROUND_COLOR = "#f5f5f5"
 OUTPUT_DIR = "outputs"
 DATA_DIR = "data"
 DB_NAME = "retail_sales.db"
+DATE_FORMAT = "%Y-%m-%d"
+BULK_BATCH_SIZE = 50000
+AGE_BINS = [0, 25, 35, 45, 55, 65, np.inf]
+AGE_LABELS = ["<25", "25-34", "35-44", "45-54", "55-64", "65+"]
+CUBE_DIMENSIONS = ["Date", "Month", "Year", "Gender", "ProductCategory", "AgeBand"]
+SCATTER_MAX_POINTS = 5000
+MV_STATE_TABLE = "materialized_view_state"
+
+# Aggregate tables kept up to date from retail_sales.
+# 'select' is formatted with a {where} filter so the same query serves the
+# full rebuild and the delta over new rows; 'merge' folds a delta row into
+# the existing aggregate (right-hand sides see the pre-update values).
+MATERIALIZED_VIEWS = {
+    "customer_summary": {
+        "source": "retail_sales",
+        "keys": ["CustomerID", "Gender", "Age"],
+        "select": """
+        SELECT
+            CustomerID,
+            Gender,
+            Age,
+            COUNT(TransactionID) AS TransactionCount,
+            SUM(TotalAmount) AS TotalSpent,
+            MIN(Date) AS FirstPurchaseDate,
+            MAX(Date) AS LastPurchaseDate,
+            JULIANDAY(MAX(Date)) - JULIANDAY(MIN(Date)) AS CustomerTenureDays
+        FROM retail_sales
+        {where}
+        GROUP BY CustomerID, Gender, Age
+        """,
+        "merge": """
+            TransactionCount = TransactionCount + excluded.TransactionCount,
+            TotalSpent = TotalSpent + excluded.TotalSpent,
+            FirstPurchaseDate = MIN(FirstPurchaseDate, excluded.FirstPurchaseDate),
+            LastPurchaseDate = MAX(LastPurchaseDate, excluded.LastPurchaseDate),
+            CustomerTenureDays = JULIANDAY(MAX(LastPurchaseDate, excluded.LastPurchaseDate))
+                - JULIANDAY(MIN(FirstPurchaseDate, excluded.FirstPurchaseDate))
+        """,
+    },
+    "product_performance": {
+        "source": "retail_sales",
+        "keys": ["ProductCategory"],
+        "select": """
+        SELECT
+            ProductCategory,
+            COUNT(TransactionID) AS TransactionCount,
+            SUM(Quantity) AS TotalUnitsSold,
+            SUM(TotalAmount) AS TotalRevenue,
+            AVG(PricexUnit) AS AvgPrice,
+            SUM(TotalAmount) / SUM(Quantity) AS RevenuePerUnit
+        FROM retail_sales
+        {where}
+        GROUP BY ProductCategory
+        """,
+        "merge": """
+            TransactionCount = TransactionCount + excluded.TransactionCount,
+            TotalUnitsSold = TotalUnitsSold + excluded.TotalUnitsSold,
+            TotalRevenue = TotalRevenue + excluded.TotalRevenue,
+            AvgPrice = (AvgPrice * TransactionCount + excluded.AvgPrice * excluded.TransactionCount)
+                / (TransactionCount + excluded.TransactionCount),
+            RevenuePerUnit = (TotalRevenue + excluded.TotalRevenue)
+                / (TotalUnitsSold + excluded.TotalUnitsSold)
+        """,
+    },
+}
 
 # Configure global visualization settings
 def configure_visuals(figsize=(12, 8), palette="pastel"):
@@ -61,29 +129,144 @@ def data_overview(data):
     print(data.isnull().sum())
     print("=".center(50,"="))
 
+# Calendar features derivable from a DatetimeIndex of distinct dates
+CALENDAR_FEATURES = {
+    "Date": lambda dates: dates,
+    "Year": lambda dates: dates.year,
+    "Month": lambda dates: dates.month,
+    "Day": lambda dates: dates.day,
+    "Weekday": lambda dates: dates.weekday,
+    "Quarter": lambda dates: dates.quarter,
+    # 'YYYY-MM' period so monthly queries can group on an indexed column
+    "YearMonth": lambda dates: dates.strftime("%Y-%m"),
+}
+
+# Parse a date column once per distinct value and derive calendar features.
+# Transaction dates repeat heavily, so parsing the factorized uniques with an
+# explicit format and mapping results back by code is far cheaper than
+# parsing every row.
+def parse_date_features(values, features=("Date", "Month", "Year", "YearMonth"),
+                        date_format=DATE_FORMAT):
+    codes, uniques = pd.factorize(values)
+    dates = pd.to_datetime(pd.Index(uniques), format=date_format)
+    if (codes < 0).any():
+        # Missing dates map to a trailing NaT slot
+        dates = dates.append(pd.DatetimeIndex([pd.NaT]))
+        codes = np.where(codes < 0, len(uniques), codes)
+    
+    return pd.DataFrame({name: np.asarray(CALENDAR_FEATURES[name](dates)).take(codes)
+                        for name in features}, index=values.index)
+
 # Clean and preprocess retail sales data
-def clean_data(data):
-    data_cleaned = data.copy()
+# copy=False cleans the caller's frame in place instead of copying it first
+def clean_data(data, copy=True, date_format=DATE_FORMAT):
+    data_cleaned = data.copy() if copy else data
     
     # Drop missing values
-    data_cleaned = data_cleaned.dropna()
+    data_cleaned.dropna(inplace=True)
     
     # Rename columns
-    data_cleaned = data_cleaned.rename(columns={
+    data_cleaned.rename(columns={
         "Transaction ID": "TransactionID",
         "Customer ID": "CustomerID",
         "Product Category": "ProductCategory",
         "Price per Unit": "PricexUnit",
         "Total Amount": "TotalAmount"
-    })
+    }, inplace=True)
     
     # Convert and extract date features
-    data_cleaned['Date'] = pd.to_datetime(data_cleaned['Date'])
-    data_cleaned['Month'] = data_cleaned['Date'].dt.month
-    data_cleaned['Year'] = data_cleaned['Date'].dt.year
+    features = parse_date_features(data_cleaned['Date'], date_format=date_format)
+    for name in features.columns:
+        data_cleaned[name] = features[name]
     
     return data_cleaned
 
+# Map a pandas dtype to the SQLite column type used by to_sql
+def _sqlite_type(dtype):
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "TIMESTAMP"
+    return "TEXT"
+
+# Convert a column into Python values sqlite3 can bind (None for missing)
+def _sqlite_values(series):
+    if pd.api.types.is_datetime64_any_dtype(series):
+        series = series.dt.strftime("%Y-%m-%d %H:%M:%S")
+    return series.astype(object).where(series.notna(), None).tolist()
+
+# Build a deterministic index name from table and columns (or expressions)
+def _index_name(table_name, columns, unique=False):
+    prefix = "ux" if unique else "idx"
+    parts = [re.sub(r"\W+", "_", col).strip("_") for col in columns]
+    name = f"{prefix}_{table_name}_{'_'.join(parts)}"
+    if len(name) > 64:
+        # Long expression keys: keep a readable prefix plus a stable checksum
+        name = f"{name[:55]}_{zlib.crc32(name.encode()):08x}"
+    return name
+
+# Read a .sql workload file into (label, query) pairs for the queries it runs.
+# Statements are separated by ';', blank lines or '--' comment lines; the
+# comment preceding a statement becomes its label. CREATE TABLE ... AS SELECT
+# contributes its SELECT.
+def load_query_workload(path=os.path.join(DATA_DIR, "retail_queries.sql")):
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    
+    statements, label, current = [], "", []
+    def flush():
+        sql = "\n".join(current).strip().rstrip(";").strip()
+        create_as = re.match(r"CREATE\s+TABLE\b.*?\bAS\s+(?=SELECT|WITH)", sql,
+                            re.IGNORECASE | re.DOTALL)
+        if create_as:
+            sql = sql[create_as.end():]
+        if re.match(r"(SELECT|WITH)\b", sql, re.IGNORECASE):
+            statements.append((label, sql))
+        current.clear()
+    
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith("--"):
+            flush()
+            label = stripped.lstrip("-").strip()
+        elif not stripped:
+            flush()
+        else:
+            current.append(line)
+            if stripped.endswith(";"):
+                flush()
+    flush()
+    return statements
+
+# Split a SQL list (SELECT items, GROUP BY terms) on top-level commas,
+# stopping at an unmatched ')' or the first clause keyword in stop
+def _split_sql_list(text, stop=r"HAVING|ORDER\s+BY|LIMIT|WINDOW"):
+    items, depth, current = [], 0, ""
+    for char in text:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            if depth == 0:
+                break
+            depth -= 1
+        elif char == "," and depth == 0:
+            items.append(current)
+            current = ""
+            continue
+        current += char
+    items.append(current)
+    
+    terms = []
+    for item in items:
+        head = re.split(rf"\s(?:{stop})\b", item, flags=re.IGNORECASE)
+        if head[0].strip():
+            terms.append(head[0].strip())
+        if len(head) > 1:
+            break
+    return terms
+
 # SQLite database operations for retail analytics
 class RetailDatabase:
     
@@ -104,8 +287,238 @@ class RetailDatabase:
     # Load DataFrame into database table
     def load_dataframe(self, df, table_name):
         df.to_sql(table_name, self.conn, index=False, if_exists='replace')
+        self._invalidate_views(table_name)
+        self.conn.commit()
         return f"Loaded {len(df)} rows to {table_name}"
     
+    # Bulk load DataFrame with batched inserts in a single transaction
+    # mode: 'replace' rebuilds the table, 'append' adds rows,
+    # 'upsert' inserts or updates rows matching key_columns
+    # defer_indexes rebuilds secondary indexes once after the load; turn it
+    # off for small incremental batches into a large table
+    def bulk_load(self, df, table_name, mode="replace", key_columns=None,
+                    indexes=None, batch_size=BULK_BATCH_SIZE, defer_indexes=True):
+        if mode not in ("replace", "append", "upsert"):
+            raise ValueError(f"Unknown mode: {mode}")
+        if mode == "upsert" and not key_columns:
+            raise ValueError("Upsert mode requires key_columns")
+        
+        columns = list(df.columns)
+        column_list = ", ".join(f'"{col}"' for col in columns)
+        placeholders = ", ".join("?" for _ in columns)
+        insert_sql = f'INSERT INTO "{table_name}" ({column_list}) VALUES ({placeholders})'
+        if mode == "upsert":
+            key_list = ", ".join(f'"{col}"' for col in key_columns)
+            updates = ", ".join(f'"{col}" = excluded."{col}"'
+                                for col in columns if col not in key_columns)
+            action = f"DO UPDATE SET {updates}" if updates else "DO NOTHING"
+            insert_sql += f" ON CONFLICT ({key_list}) {action}"
+        
+        # Tune PRAGMAs for the load; they cannot change inside a transaction
+        self.conn.commit()
+        cursor = self.conn.cursor()
+        journal_mode = cursor.execute("PRAGMA journal_mode").fetchone()[0]
+        synchronous = cursor.execute("PRAGMA synchronous").fetchone()[0]
+        cursor.execute("PRAGMA journal_mode = MEMORY")
+        cursor.execute("PRAGMA synchronous = OFF")
+        
+        start = time.perf_counter()
+        try:
+            cursor.execute("BEGIN")
+            if mode == "replace":
+                cursor.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+            column_defs = ", ".join(f'"{col}" {_sqlite_type(df[col].dtype)}' for col in columns)
+            cursor.execute(f'CREATE TABLE IF NOT EXISTS "{table_name}" ({column_defs})')
+            
+            # Defer secondary indexes: drop them now, rebuild after the load
+            deferred = []
+            if defer_indexes:
+                deferred = cursor.execute(
+                    "SELECT name, sql FROM sqlite_master "
+                    "WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL "
+                    "AND sql NOT LIKE 'CREATE UNIQUE%'", (table_name,)).fetchall()
+            for name, _ in deferred:
+                cursor.execute(f'DROP INDEX "{name}"')
+            if mode == "upsert":
+                # ON CONFLICT needs a unique index on the key columns
+                cursor.execute(
+                    f'CREATE UNIQUE INDEX IF NOT EXISTS "{_index_name(table_name, key_columns, unique=True)}" '
+                    f'ON "{table_name}" ({key_list})')
+            
+            for offset in range(0, len(df), batch_size):
+                batch = df.iloc[offset:offset + batch_size]
+                rows = zip(*(_sqlite_values(batch[col]) for col in columns))
+                cursor.executemany(insert_sql, rows)
+            
+            # Rows were replaced or updated in place, so the rowid watermark
+            # no longer describes what the aggregates have seen
+            if mode != "append":
+                self._invalidate_views(table_name)
+            
+            for _, sql in deferred:
+                cursor.execute(sql)
+            for index_columns in indexes or []:
+                if isinstance(index_columns, str):
+                    index_columns = [index_columns]
+                index_list = ", ".join(f'"{col}"' for col in index_columns)
+                cursor.execute(
+                    f'CREATE INDEX IF NOT EXISTS "{_index_name(table_name, index_columns)}" '
+                    f'ON "{table_name}" ({index_list})')
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            cursor.execute(f"PRAGMA journal_mode = {journal_mode}")
+            cursor.execute(f"PRAGMA synchronous = {synchronous}")
+        
+        elapsed = time.perf_counter() - start
+        rate = len(df) / elapsed if elapsed > 0 else float("inf")
+        return f"Loaded {len(df)} rows to {table_name} ({mode}) in {elapsed:.2f}s [{rate:,.0f} rows/sec]"
+    
+    # Forget the watermark of every view fed by table_name (forces a rebuild)
+    def _invalidate_views(self, table_name):
+        views = [name for name, view in MATERIALIZED_VIEWS.items() if view["source"] == table_name]
+        if not views:
+            return
+        cursor = self.conn.cursor()
+        cursor.execute(f'CREATE TABLE IF NOT EXISTS "{MV_STATE_TABLE}" '
+                        f'(ViewName TEXT PRIMARY KEY, LastRowid INTEGER)')
+        cursor.executemany(f'DELETE FROM "{MV_STATE_TABLE}" WHERE ViewName = ?',
+                            [(name,) for name in views])
+    
+    # Bring materialized aggregate tables up to date with their source table.
+    # Only rows appended since the last refresh (rowid above the stored
+    # watermark) are aggregated and merged; a view is rebuilt in full when it
+    # has no watermark yet, its source was replaced, or full=True.
+    def refresh_materialized_views(self, names=None, full=False):
+        messages = []
+        cursor = self.conn.cursor()
+        cursor.execute(f'CREATE TABLE IF NOT EXISTS "{MV_STATE_TABLE}" '
+                        f'(ViewName TEXT PRIMARY KEY, LastRowid INTEGER)')
+        self.conn.commit()
+        
+        for name in names or MATERIALIZED_VIEWS:
+            view = MATERIALIZED_VIEWS[name]
+            source = view["source"]
+            key_list = ", ".join(view["keys"])
+            try:
+                cursor.execute("BEGIN")
+                high = cursor.execute(f'SELECT COALESCE(MAX(rowid), 0) FROM "{source}"').fetchone()[0]
+                state = cursor.execute(f'SELECT LastRowid FROM "{MV_STATE_TABLE}" WHERE ViewName = ?',
+                                        (name,)).fetchone()
+                if full or state is None or state[0] > high:
+                    cursor.execute(f'DROP TABLE IF EXISTS "{name}"')
+                    cursor.execute(f'CREATE TABLE "{name}" AS ' + view["select"].format(where=""))
+                    cursor.execute(f'CREATE UNIQUE INDEX "{_index_name(name, view["keys"], unique=True)}" '
+                                    f'ON "{name}" ({key_list})')
+                    refresh_type, new_rows = "full", high
+                else:
+                    low = state[0]
+                    cursor.execute(
+                        f'INSERT INTO "{name}" '
+                        + view["select"].format(where="WHERE rowid > ? AND rowid <= ?")
+                        + f' ON CONFLICT ({key_list}) DO UPDATE SET ' + view["merge"],
+                        (low, high))
+                    refresh_type, new_rows = "incremental", high - low
+                cursor.execute(f'INSERT OR REPLACE INTO "{MV_STATE_TABLE}" (ViewName, LastRowid) VALUES (?, ?)',
+                                (name, high))
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+            messages.append(f"Refreshed {name} ({refresh_type}, {new_rows} source rows)")
+        return messages
+    
+    # Return the EXPLAIN QUERY PLAN rows for a query
+    def explain_query(self, query):
+        return self.run_query(f"EXPLAIN QUERY PLAN {query}")
+    
+    # Score a plan: temp B-tree sorts cost more than full scans of real tables
+    def _plan_cost(self, plan_details, tables):
+        full_scans = sum(1 for detail in plan_details
+                        if re.fullmatch(r"SCAN (\w+)", detail) and detail.split()[1] in tables)
+        temp_sorts = sum(1 for detail in plan_details if "TEMP B-TREE" in detail)
+        return 2 * temp_sorts + full_scans
+    
+    # Propose a covering index for a query on table_name: GROUP BY terms lead
+    # (resolved like SQLite does: table columns first, then SELECT aliases),
+    # followed by every other column the query references
+    def _candidate_index(self, query, table_name):
+        columns = self.run_query(f'PRAGMA table_info("{table_name}")')["name"].tolist()
+        aliases = {}
+        for match in re.finditer(r"\bSELECT\s+(?:DISTINCT\s+)?", query, re.IGNORECASE):
+            for item in _split_sql_list(query[match.end():], stop="FROM"):
+                aliased = re.fullmatch(r"(.+)\s+AS\s+(\w+)", item, re.IGNORECASE | re.DOTALL)
+                if aliased:
+                    aliases[aliased.group(2)] = aliased.group(1).strip()
+        
+        keys = []
+        for match in re.finditer(r"GROUP\s+BY\s+", query, re.IGNORECASE):
+            for term in _split_sql_list(query[match.end():]):
+                if term not in columns and term in aliases:
+                    term = aliases[term]
+                if term not in keys:
+                    keys.append(term)
+        if not keys:
+            return None
+        
+        referenced = [col for col in columns
+                        if col not in keys and re.search(rf"\b{col}\b", query)]
+        return keys + referenced
+    
+    # Index advisor for a query workload (a .sql path or a list of queries).
+    # Each query is explained; where the plan scans a table or sorts through a
+    # temp B-tree, a covering (or expression) index is created and kept only
+    # if it lowers the plan cost. Returns a report DataFrame.
+    def advise_indexes(self, workload=os.path.join(DATA_DIR, "retail_queries.sql"), apply=True):
+        if isinstance(workload, str):
+            workload = load_query_workload(workload)
+        workload = [item if isinstance(item, tuple) else ("", item) for item in workload]
+        tables = set(self.run_query("SELECT name FROM sqlite_master WHERE type = 'table'")["name"])
+        
+        report = []
+        cursor = self.conn.cursor()
+        for label, query in workload:
+            try:
+                before = self.explain_query(query)["detail"].tolist()
+            except Exception as e:
+                report.append({"Query": label, "PlanBefore": str(e), "Index": None,
+                                "PlanAfter": None, "Kept": False})
+                continue
+            cost = self._plan_cost(before, tables)
+            scanned = [detail.split()[1] for detail in before
+                        if detail.startswith("SCAN ") and detail.split()[1] in tables]
+            
+            for table_name in dict.fromkeys(scanned):
+                if cost == 0:
+                    break
+                index_columns = self._candidate_index(query, table_name)
+                if index_columns is None:
+                    continue
+                index_name = _index_name(table_name, index_columns)
+                index_sql = (f'CREATE INDEX IF NOT EXISTS "{index_name}" '
+                            f'ON "{table_name}" ({", ".join(index_columns)})')
+                try:
+                    cursor.execute(index_sql)
+                except sqlite3.Error as e:
+                    report.append({"Query": label, "PlanBefore": " | ".join(before), "Index": index_sql,
+                                    "PlanAfter": str(e), "Kept": False})
+                    continue
+                after = self.explain_query(query)["detail"].tolist()
+                new_cost = self._plan_cost(after, tables)
+                kept = apply and new_cost < cost
+                if kept:
+                    cost = new_cost
+                    self.conn.commit()
+                else:
+                    cursor.execute(f'DROP INDEX IF EXISTS "{index_name}"')
+                    self.conn.commit()
+                report.append({"Query": label, "PlanBefore": " | ".join(before), "Index": index_sql,
+                                "PlanAfter": " | ".join(after), "Kept": kept})
+                before = after
+        return pd.DataFrame(report, columns=["Query", "PlanBefore", "Index", "PlanAfter", "Kept"])
+    
     # Close database connection
     def close(self):
         self.conn.close()
@@ -116,8 +529,30 @@ class RetailDatabase:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
 
+# Pre-aggregate sales once by (Date, Month, Year, Gender, ProductCategory, AgeBand).
+# Every dashboard panel is a roll-up of this cube, so plots never see raw
+# transaction rows.
+def build_sales_cube(data):
+    age_band = pd.cut(data['Age'], bins=AGE_BINS, labels=AGE_LABELS, right=False)
+    cube = (data.assign(AgeBand=age_band)
+                .groupby(CUBE_DIMENSIONS, observed=True, sort=False)
+                .agg(TotalAmount=('TotalAmount', 'sum'),
+                    Quantity=('Quantity', 'sum'),
+                    Transactions=('TotalAmount', 'size'))
+                .reset_index())
+    return cube
+
+# Roll the cube up to a coarser set of dimensions
+def rollup_cube(cube, dimensions):
+    return (cube.groupby(dimensions, observed=True)[['TotalAmount', 'Quantity', 'Transactions']]
+                .sum()
+                .reset_index())
+
 # Generate comprehensive EDA dashboard
-def create_eda_dashboard(data):
+def create_eda_dashboard(data, cube=None):
+    if cube is None:
+        cube = build_sales_cube(data)
+    
     fig = plt.figure(figsize=(20, 40))
     gs = fig.add_gridspec(10, 2)
     gs.update(wspace=0.3, hspace=0.8)
@@ -138,12 +573,13 @@ def create_eda_dashboard(data):
     axes = [fig.add_subplot(gs[i//2, i%2]) for i in range(12)]
     
     # Visualization 1: Sales by Product Category
-    sns.barplot(data=data, x='TotalAmount', y='ProductCategory', 
-                estimator=sum, ci=None, palette='Blues_d', ax=axes[0])
+    category_sales = rollup_cube(cube, ['ProductCategory'])
+    sns.barplot(data=category_sales, x='TotalAmount', y='ProductCategory', 
+                ci=None, palette='Blues_d', ax=axes[0])
     axes[0].set_title('Total Sales by Product Category', fontsize=14, fontweight='bold')
     
     # Visualization 2: Sales Trend
-    sales_over_time = data.groupby('Date')['TotalAmount'].sum().reset_index()
+    sales_over_time = rollup_cube(cube, ['Date'])
     sns.lineplot(data=sales_over_time, x='Date', y='TotalAmount', 
                 color='mediumseagreen', ax=axes[1])
     axes[1].set_title('Daily Sales Trend', fontsize=14, fontweight='bold')
@@ -156,9 +592,14 @@ def create_eda_dashboard(data):
     plt.close()
     
 # Generate interactive Plotly visualizations
-def create_interactive_plots(data):
+# Aggregate charts come from the sales cube; the scatter matrix is drawn from
+# a random sample of at most max_points rows to keep the HTML small.
+def create_interactive_plots(data, cube=None, max_points=SCATTER_MAX_POINTS):
+    if cube is None:
+        cube = build_sales_cube(data)
+    
     # Monthly Sales Trend
-    monthly_sales = data.groupby(['Year', 'Month'])['TotalAmount'].sum().reset_index()
+    monthly_sales = rollup_cube(cube, ['Year', 'Month'])
     monthly_sales['Period'] = monthly_sales['Month'].astype(str) + '-' + monthly_sales['Year'].astype(str)
     
     fig = px.line(monthly_sales, x='Period', y='TotalAmount', 
@@ -167,12 +608,15 @@ def create_interactive_plots(data):
     fig.write_html(os.path.join(OUTPUT_DIR, 'monthly_sales_trend.html'))
     
     # Sunburst Chart
-    fig = px.sunburst(data, path=['Gender', 'ProductCategory'], values='TotalAmount',
+    gender_category_sales = rollup_cube(cube, ['Gender', 'ProductCategory'])
+    fig = px.sunburst(gender_category_sales, path=['Gender', 'ProductCategory'], values='TotalAmount',
                     title='Sales Distribution by Gender and Product Category',
                     template='plotly_white')
     fig.write_html(os.path.join(OUTPUT_DIR, 'sales_sunburst.html'))
     
     # Scatter Matrix
+    if len(data) > max_points:
+        data = data.sample(n=max_points, random_state=42)
     fig = px.scatter_matrix(data,
                         dimensions=['Age', 'Quantity', 'PricexUnit', 'TotalAmount'],
                         color='Gender',
@@ -182,21 +626,8 @@ def create_interactive_plots(data):
 
 # Perform customer segmentation analysis
 def analyze_customer_segments(db):
-    # Create customer summary table
-    db.execute_sql("""
-    CREATE TABLE IF NOT EXISTS customer_summary AS
-    SELECT
-        CustomerID,
-        Gender,
-        Age,
-        COUNT(TransactionID) AS TransactionCount,
-        SUM(TotalAmount) AS TotalSpent,
-        MIN(Date) AS FirstPurchaseDate,
-        MAX(Date) AS LastPurchaseDate,
-        JULIANDAY(MAX(Date)) - JULIANDAY(MIN(Date)) AS CustomerTenureDays
-    FROM retail_sales
-    GROUP BY CustomerID, Gender, Age
-    """)
+    # Bring customer summary table up to date with new sales
+    db.refresh_materialized_views(["customer_summary"])
     
     # Segmentation query
     segments = db.run_query("""
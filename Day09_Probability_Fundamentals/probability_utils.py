@@ -1,43 +1,80 @@
 # Import necessary libraries
+import os
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import pandas as pd
-import random
-from math import comb
+from scipy.special import gammaln, xlog1py, xlogy
 from scipy.stats import bernoulli, binom, norm
 
+# Random number generation
+
+# Return a PCG64-backed numpy Generator.
+def make_rng(seed=None):
+    """
+    Parameters:
+        seed (int, SeedSequence, Generator or None): Seed material. An existing
+            Generator is returned unchanged so callers can share a stream.
+    
+    Returns:
+        np.random.Generator: Generator using the PCG64 bit generator.
+    """
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.Generator(np.random.PCG64(seed))
+
+
+# Create independent, reproducible generators from a single seed.
+def spawn_rngs(seed=None, n_streams=2):
+    """
+    Parameters:
+        seed (int, SeedSequence or None): Root seed.
+        n_streams (int): Number of independent streams.
+    
+    Returns:
+        list[np.random.Generator]: One PCG64 generator per spawned SeedSequence.
+    """
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    return [np.random.Generator(np.random.PCG64(child)) for child in root.spawn(n_streams)]
+
+
 # Data generation utilities
 
 # Simulate coin tosses and return a pandas DataFrame.
-def generate_coin_tosses(n_tosses=500, seed=None):
+def generate_coin_tosses(n_tosses=500, seed=None, as_frame=True):
     """    
     Parameters:
         n_tosses (int): Number of tosses to simulate.
-        seed (int or None): Optional random seed for reproducibility.
+        seed (int, SeedSequence, Generator or None): Optional seed or generator for reproducibility.
+        as_frame (bool): If False, return the raw uint8 outcome codes (0=Heads, 1=Tails).
     
     Returns:
-        pd.DataFrame: Columns ['toss_number', 'results'] with 'Heads' or 'Tails'.
+        pd.DataFrame: Columns ['toss_number', 'results'] with categorical 'Heads' or 'Tails'.
     """
-    if seed is not None:
-        random.seed(seed)
-    results = [random.choice(["Heads", "Tails"]) for _ in range(n_tosses)]
-    return pd.DataFrame({"toss_number": range(1, n_tosses + 1), "results": results})
+    codes = make_rng(seed).integers(0, 2, size=n_tosses, dtype=np.uint8)
+    if not as_frame:
+        return codes
+    results = pd.Categorical.from_codes(codes, categories=["Heads", "Tails"])
+    return pd.DataFrame({"toss_number": np.arange(1, n_tosses + 1), "results": results})
 
 
 # Simulate dice rolls and return a pandas DataFrame.
-def generate_dice_rolls(n_rolls=500, sides=6, seed=None):
+def generate_dice_rolls(n_rolls=500, sides=6, seed=None, as_frame=True, dtype=np.int64):
     """
     Parameters:
         n_rolls (int): Number of rolls to simulate.
         sides (int): Number of sides on the die.
-        seed (int or None): Optional random seed for reproducibility.
+        seed (int, SeedSequence, Generator or None): Optional seed or generator for reproducibility.
+        as_frame (bool): If False, return the raw array of results.
+        dtype (integer dtype): Result dtype; pass e.g. np.uint8 for compact storage
+            (arithmetic on it can overflow).
     
     Returns:
         pd.DataFrame: Columns ['roll_number', 'results'].
     """
-    if seed is not None:
-        random.seed(seed)
-    results = [random.randint(1, sides) for _ in range(n_rolls)]
-    return pd.DataFrame({"roll_number": range(1, n_rolls + 1), "results": results})
+    results = make_rng(seed).integers(1, sides, size=n_rolls, dtype=dtype, endpoint=True)
+    if not as_frame:
+        return results
+    return pd.DataFrame({"roll_number": np.arange(1, n_rolls + 1), "results": results})
 
 
 # Simulate a dataset of events with associated probabilities.
@@ -46,24 +83,133 @@ def generate_events_dataset(n_events=500, event_types=None, seed=None):
     Parameters:
         n_events (int): Number of events to generate.
         event_types (list[str] or None): List of event categories.
-        seed (int or None): Optional random seed.
+        seed (int, SeedSequence, Generator or None): Optional seed or generator.
     
     Returns:
-        pd.DataFrame: Columns ['event_id', 'event_type', 'probability'].
+        pd.DataFrame: Columns ['event_id', 'event_type', 'probability'] with a categorical event_type.
     """
     if event_types is None:
         event_types = ["Rain", "Sunny", "Cloudy", "Snow", "Storm"]
-    if seed is not None:
-        random.seed(seed)
-    event_type_list = [random.choice(event_types) for _ in range(n_events)]
-    probabilities = [round(random.uniform(0, 1), 2) for _ in range(n_events)]
+    rng = make_rng(seed)
+    codes = rng.integers(0, len(event_types), size=n_events)
+    probabilities = np.round(rng.random(n_events), 2)
     return pd.DataFrame({
-        "event_id": range(1, n_events + 1),
-        "event_type": event_type_list,
+        "event_id": np.arange(1, n_events + 1),
+        "event_type": pd.Categorical.from_codes(codes, categories=event_types),
         "probability": probabilities
     })
 
 
+# Monte Carlo simulation
+
+# Mergeable running statistics (count, mean, variance, min/max, histogram).
+class MonteCarloAccumulator:
+    """
+    Partial results from separate chunks or processes are combined with merge()
+    using the parallel mean/variance update, so reductions never need the
+    underlying draws.
+    
+    Parameters:
+        bins (array-like or None): Fixed histogram bin edges shared by every chunk.
+    """
+    def __init__(self, bins=None):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.bins = None if bins is None else np.asarray(bins, dtype=float)
+        self.histogram = None if bins is None else np.zeros(len(self.bins) - 1, dtype=np.int64)
+
+    # Fold a batch of draws into the running statistics.
+    def update(self, values):
+        values = np.asarray(values).ravel()
+        if values.size == 0:
+            return self
+        batch = MonteCarloAccumulator(self.bins)
+        batch.count = values.size
+        batch.mean = float(values.mean(dtype=np.float64))
+        batch.m2 = float(np.square(values - batch.mean).sum())
+        batch.min = float(values.min())
+        batch.max = float(values.max())
+        if self.bins is not None:
+            batch.histogram = np.histogram(values, bins=self.bins)[0]
+        return self.merge(batch)
+
+    # Combine another accumulator into this one.
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta**2 * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if self.histogram is not None:
+            self.histogram = self.histogram + other.histogram
+        return self
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else float("nan")
+
+    @property
+    def std_error(self):
+        return np.sqrt(self.variance / self.count) if self.count > 1 else float("nan")
+
+    # Normal-approximation confidence interval for the mean.
+    def confidence_interval(self, confidence=0.95):
+        z = norm.ppf(0.5 + confidence / 2)
+        return self.mean - z * self.std_error, self.mean + z * self.std_error
+
+
+# Simulate one chunk in a worker with its own spawned stream.
+def _monte_carlo_chunk(simulate, seed_seq, size, bins):
+    rng = np.random.Generator(np.random.PCG64(seed_seq))
+    return MonteCarloAccumulator(bins).update(simulate(size, seed=rng))
+
+
+# Run a chunked Monte Carlo simulation across a process pool.
+def run_monte_carlo(simulate, n_draws, seed=None, n_workers=None, chunk_size=1_000_000, bins=None):
+    """
+    Parameters:
+        simulate (callable): Picklable function called as simulate(size, seed=rng)
+            returning an array of draws, e.g.
+            functools.partial(generate_dice_rolls, as_frame=False).
+        n_draws (int): Total number of draws.
+        seed (int, SeedSequence or None): Root seed; every chunk gets its own
+            SeedSequence.spawn child.
+        n_workers (int or None): Worker processes (defaults to os.cpu_count();
+            1 runs in the current process).
+        chunk_size (int): Draws per chunk, which bounds per-worker memory.
+        bins (array-like or None): Histogram bin edges.
+    
+    Returns:
+        MonteCarloAccumulator: Merged statistics over all draws.
+    
+    Chunk streams depend only on seed and chunk_size, and partial results are
+    merged in chunk order, so results are bit-for-bit reproducible.
+    """
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    sizes = [min(chunk_size, n_draws - start) for start in range(0, n_draws, chunk_size)]
+    seeds = root.spawn(len(sizes))
+    n_workers = n_workers or os.cpu_count() or 1
+    
+    result = MonteCarloAccumulator(bins)
+    if n_workers == 1 or len(sizes) == 1:
+        for seed_seq, size in zip(seeds, sizes):
+            result.merge(_monte_carlo_chunk(simulate, seed_seq, size, bins))
+        return result
+    
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        partials = pool.map(_monte_carlo_chunk, [simulate] * len(sizes), seeds, sizes, [bins] * len(sizes))
+        for partial in partials:
+            result.merge(partial)
+    return result
+
+
 # Probability calculations
 
 # Calculate the empirical probability given a boolean array/Series.
@@ -78,6 +224,135 @@ def empirical_probability(condition):
     return np.mean(condition)
 
 
+# Wilson score confidence interval for a proportion (vectorized).
+def wilson_interval(successes, trials, confidence=0.95):
+    """
+    Parameters:
+        successes (int or array-like): Number of favorable outcomes.
+        trials (int): Number of observations.
+        confidence (float): Confidence level.
+    
+    Returns:
+        tuple: (lower, upper) bounds, NaN when there are no trials.
+    """
+    successes = np.asarray(successes, dtype=float)
+    if trials == 0:
+        nan = np.full_like(successes, np.nan)
+        return nan, nan
+    z = norm.ppf(0.5 + confidence / 2)
+    p_hat = successes / trials
+    denom = 1 + z**2 / trials
+    center = (p_hat + z**2 / (2 * trials)) / denom
+    half_width = z * np.sqrt(p_hat * (1 - p_hat) / trials + z**2 / (4 * trials**2)) / denom
+    return center - half_width, center + half_width
+
+
+# Running empirical probability over chunks of boolean outcomes.
+class StreamingProbability:
+    """
+    Only the success and trial counts are kept, so the data never needs to
+    fit in memory.
+    
+    Parameters:
+        confidence (float): Confidence level used for the interval.
+    """
+    def __init__(self, confidence=0.95):
+        self.confidence = confidence
+        self.successes = 0
+        self.trials = 0
+
+    # Add a chunk of boolean outcomes.
+    def update(self, condition):
+        condition = np.asarray(condition, dtype=bool)
+        self.successes += int(np.count_nonzero(condition))
+        self.trials += condition.size
+        return self
+
+    @property
+    def estimate(self):
+        return self.successes / self.trials if self.trials else float("nan")
+
+    # Wilson interval for the current estimate.
+    def confidence_interval(self):
+        lower, upper = wilson_interval(self.successes, self.trials, self.confidence)
+        return float(lower), float(upper)
+
+    @property
+    def width(self):
+        lower, upper = self.confidence_interval()
+        return upper - lower
+
+
+# Running probability mass function over chunks of observed values.
+class StreamingPMF:
+    """
+    Keeps running counts per distinct value; each chunk is reduced with
+    value_counts before being added.
+    
+    Parameters:
+        confidence (float): Confidence level used for per-value intervals.
+    """
+    def __init__(self, confidence=0.95):
+        self.confidence = confidence
+        self.counts = pd.Series(dtype=np.int64)
+        self.trials = 0
+
+    # Add a chunk of observed values.
+    def update(self, values):
+        chunk_counts = pd.Series(values).value_counts()
+        self.counts = self.counts.add(chunk_counts, fill_value=0).astype(np.int64)
+        self.trials += int(chunk_counts.sum())
+        return self
+
+    # Current PMF, in the same form as pmf_from_data.
+    def pmf(self):
+        return (self.counts / self.trials).sort_index()
+
+    # Per-value Wilson intervals as a DataFrame.
+    def confidence_intervals(self):
+        counts = self.counts.sort_index()
+        lower, upper = wilson_interval(counts.values, self.trials, self.confidence)
+        return pd.DataFrame({"probability": counts.values / self.trials,
+                            "lower": lower, "upper": upper}, index=counts.index)
+
+    @property
+    def width(self):
+        if not self.trials:
+            return float("nan")
+        intervals = self.confidence_intervals()
+        return float((intervals["upper"] - intervals["lower"]).max())
+
+
+# Consume chunks into a streaming estimator, stopping early once precise enough.
+def consume_chunks(estimator, chunks, target_width=None, min_trials=1000):
+    """
+    Parameters:
+        estimator (StreamingProbability or StreamingPMF): Estimator to update.
+        chunks (iterable): Chunks of outcomes/values (arrays, Series or lists).
+        target_width (float or None): Stop once the (widest) confidence interval is
+            narrower than this. None reads every chunk.
+        min_trials (int): Observations required before stopping is considered.
+    
+    Returns:
+        The updated estimator.
+    
+    The stopping rule checks a fixed-sample interval after each chunk, so the
+    reported interval is approximate when stopping early.
+    """
+    for chunk in chunks:
+        estimator.update(chunk)
+        if (target_width is not None and estimator.trials >= min_trials
+                and estimator.width <= target_width):
+            break
+    return estimator
+
+
+# Yield one column of a CSV file in chunks without loading the whole file.
+def read_column_chunks(path, column, chunksize=1_000_000):
+    for chunk in pd.read_csv(path, usecols=[column], chunksize=chunksize):
+        yield chunk[column]
+
+
 # Return the probability of not A given P(A).
 def complement_rule(p_a):
     return 1 - p_a
@@ -109,16 +384,76 @@ def pmf_from_data(values):
     return pd.Series(values).value_counts(normalize=True).sort_index()
 
 
-# Compute the expected value given a PMF.
+# PMF stored as contiguous support and probability arrays.
+class ArrayPMF:
+    """
+    A single PMF uses 1D arrays of length k. A batch of m PMFs uses a
+    probability matrix of shape (m, k) with either a shared support of length k
+    or a support matrix of shape (m, k); shorter supports are padded with zero
+    probability.
+    
+    Parameters:
+        support (array-like): Outcome values.
+        probabilities (array-like): Probabilities aligned with support.
+    """
+    def __init__(self, support, probabilities):
+        self.support = np.ascontiguousarray(support, dtype=np.float64)
+        self.probabilities = np.ascontiguousarray(probabilities, dtype=np.float64)
+        if self.support.shape[-1] != self.probabilities.shape[-1]:
+            raise ValueError("support and probabilities must have the same last dimension")
+
+    # Build from a PMF Series (index = values), e.g. the output of pmf_from_data.
+    @classmethod
+    def from_series(cls, pmf):
+        return cls(pmf.index.to_numpy(dtype=np.float64), pmf.to_numpy(dtype=np.float64))
+
+    # Build from observed data.
+    @classmethod
+    def from_data(cls, values):
+        support, counts = np.unique(np.asarray(values), return_counts=True)
+        return cls(support, counts / counts.sum())
+
+    # Raw moments E[X^1..X^order] in one vectorized pass.
+    def raw_moments(self, order=4):
+        powers = self.support[..., np.newaxis] ** np.arange(1, order + 1)
+        return np.einsum("...k,...kj->...j", self.probabilities, powers)
+
+    # Central moments E[(X - mean)^1..^order], taken around the mean rather than
+    # derived from raw moments, which cancel badly when the mean is large.
+    def central_moments(self, order=4):
+        mean = np.asarray(self.mean)[..., np.newaxis]
+        powers = (self.support - mean)[..., np.newaxis] ** np.arange(1, order + 1)
+        return np.einsum("...k,...kj->...j", self.probabilities, powers)
+
+    # Mean, variance, skewness and excess kurtosis (arrays for a batch).
+    def moments(self):
+        _, var, mu3, mu4 = np.moveaxis(self.central_moments(4), -1, 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            skewness = mu3 / var**1.5
+            kurtosis = mu4 / var**2 - 3
+        return {"mean": self.mean, "variance": var, "skewness": skewness, "kurtosis": kurtosis}
+
+    @property
+    def mean(self):
+        return np.einsum("...k,...k->...", self.probabilities, self.support)
+
+    @property
+    def variance(self):
+        return self.central_moments(2)[..., 1]
+
+
+# Compute the expected value given a PMF (Series or ArrayPMF).
 def expected_value(pmf):
-    return sum(x * p for x, p in pmf.items())
+    if not isinstance(pmf, ArrayPMF):
+        pmf = ArrayPMF.from_series(pmf)
+    return pmf.mean
 
 
-# Compute the variance given a PMF.
+# Compute the variance given a PMF (Series or ArrayPMF).
 def variance(pmf):
-    e_x = expected_value(pmf)
-    e_x2 = sum((x**2) * p for x, p in pmf.items())
-    return e_x2 - e_x**2
+    if not isinstance(pmf, ArrayPMF):
+        pmf = ArrayPMF.from_series(pmf)
+    return pmf.variance
 
 
 # Distribution helpers
@@ -146,7 +481,37 @@ def normal_cdf(x, mu, sigma):
 
 # Combinatorics
 
+# Size limit for the cached log-factorial table (entries); larger n falls back to gammaln
+LOG_FACTORIAL_TABLE_LIMIT = 2**23
+_log_factorial_table = np.zeros(1)
+
+
+# Return log(k!) for scalar or array k, served from a cached table.
+def log_factorial(k):
+    global _log_factorial_table
+    k = np.asarray(k, dtype=np.int64)
+    max_k = int(k.max()) if k.size else 0
+    if max_k >= len(_log_factorial_table):
+        if max_k >= LOG_FACTORIAL_TABLE_LIMIT:
+            return gammaln(k + 1.0)
+        # Grow geometrically so repeated calls with increasing n stay cheap
+        size = min(max(max_k + 1, 2 * len(_log_factorial_table)), LOG_FACTORIAL_TABLE_LIMIT)
+        _log_factorial_table = gammaln(np.arange(size) + 1.0)
+    return _log_factorial_table[k]
+
+
+# Calculate log P(X=k) for a Binomial(n, p); k may be an array (-inf outside 0..n).
+def log_binomial_probability(n, k, p):
+    k = np.asarray(k, dtype=np.int64)
+    valid = (k >= 0) & (k <= n)
+    k_safe = np.where(valid, k, 0)
+    log_comb = log_factorial(n) - log_factorial(k_safe) - log_factorial(n - k_safe)
+    log_pmf = log_comb + xlogy(k_safe, p) + xlog1py(n - k_safe, -p)
+    return np.where(valid, log_pmf, -np.inf)
+
+
 # Calculate P(X = k) for a Binomial(n, p) distribution using the formula:
-# C(n, k) * p^k * (1-p)^(n-k)
+# C(n, k) * p^k * (1-p)^(n-k), evaluated in log space so large n neither
+# builds huge integers nor under/overflows. k may be an array of counts.
 def binomial_probability(n, k, p):
-    return comb(n, k) * (p ** k) * ((1 - p) ** (n - k))
+    return np.exp(log_binomial_probability(n, k, p))
@@ -0,0 +1,20 @@
+import numpy as np
+
+from probability_utils import ArrayPMF, generate_dice_rolls
+
+
+def test_moments_stable_for_large_support():
+    pmf = ArrayPMF([1e4, 1e4 + 1, 1e4 + 2], [0.25, 0.5, 0.25])
+    moments = pmf.moments()
+    assert moments["mean"] == 1e4 + 1
+    np.testing.assert_allclose([moments["variance"], moments["skewness"], moments["kurtosis"]],
+                               [0.5, 0.0, -1.0], atol=1e-12)
+    np.testing.assert_allclose(pmf.variance, 0.5)
+
+
+def test_dice_rolls_support_squares():
+    rolls = generate_dice_rolls(5000, sides=20, seed=0)
+    assert rolls["results"].dtype == np.int64
+    assert (rolls["results"] ** 2).max() == 400
+    compact = generate_dice_rolls(10, sides=20, seed=0, as_frame=False, dtype=np.uint8)
+    assert compact.dtype == np.uint8
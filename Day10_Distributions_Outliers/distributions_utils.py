@@ -1,10 +1,12 @@
 # Import necessary libraries
+import warnings
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-from scipy.stats import norm, zscore, probplot
-from math import comb
+from scipy.stats import norm, zscore
+from scipy.special import bdtr, bdtrc, gammaln, xlog1py, xlogy
+from functools import lru_cache
 
 # Visualization settings
 sns.set(style="whitegrid")
@@ -23,20 +25,163 @@ def generate_sales_data(shape=2, scale=1000, size=200, outliers=None, seed=None)
         data = np.append(data, outliers)
     return data
 
-# Plot histogram with KDE curve
-def plot_distribution(data, title="Distribution", xlabel="Value", ylabel="Frequency", color='skyblue'):
+# Distribution diagnostics
+# Points are read in blocks of DIAGNOSTIC_BLOCK_SIZE (memmaps never load whole),
+# and sort-based steps run on a random sample of at most DIAGNOSTIC_SAMPLE_SIZE.
+# NaN and infinite values are skipped, as histplot does.
+DIAGNOSTIC_BLOCK_SIZE = 10_000_000
+DIAGNOSTIC_SAMPLE_SIZE = 1_000_000
+
+# Positionally indexed points: memmaps stay on disk, anything else (lists,
+# Series with any index) becomes a float array
+def diagnostic_points(data):
+    if isinstance(data, np.memmap):
+        return data
+    return np.asarray(data, dtype=float).ravel()
+
+# Finite values of one block as floats
+def _finite_block(block):
+    block = np.asarray(block, dtype=float)
+    return block[np.isfinite(block)]
+
+# Uniform random sample of at most max_size finite points (positions are
+# sorted so memmap reads stay sequential)
+def diagnostic_sample(data, max_size=DIAGNOSTIC_SAMPLE_SIZE, seed=0):
+    data = diagnostic_points(data)
+    if len(data) <= max_size:
+        return _finite_block(data)
+    positions = np.sort(np.random.default_rng(seed).integers(0, len(data), size=max_size))
+    return _finite_block(data[positions])
+
+# Count, mean, variance, skewness, excess kurtosis, min and max of the finite
+# values in one blocked pass. Power sums are taken around the first finite
+# value to limit cancellation.
+def summary_moments(data):
+    data = diagnostic_points(data)
+    shift = None
+    n, s1, s2, s3, s4 = 0, 0.0, 0.0, 0.0, 0.0
+    low, high = np.inf, -np.inf
+    for start in range(0, len(data), DIAGNOSTIC_BLOCK_SIZE):
+        block = _finite_block(data[start:start + DIAGNOSTIC_BLOCK_SIZE])
+        if len(block) == 0:
+            continue
+        if shift is None:
+            shift = block[0]
+        block = block - shift
+        block_sq = block * block
+        n += len(block)
+        s1 += block.sum()
+        s2 += block_sq.sum()
+        s3 += (block_sq * block).sum()
+        s4 += (block_sq * block_sq).sum()
+        low, high = min(low, block.min()), max(high, block.max())
+    if n == 0:
+        raise ValueError("data has no finite values")
+    m1, m2, m3, m4 = s1 / n, s2 / n, s3 / n, s4 / n
+    var = m2 - m1**2
+    mu3 = m3 - 3 * m1 * m2 + 2 * m1**3
+    mu4 = m4 - 4 * m1 * m3 + 6 * m1**2 * m2 - 3 * m1**4
+    return {"count": n, "mean": m1 + shift, "variance": var,
+            "skewness": mu3 / var**1.5, "kurtosis": mu4 / var**2 - 3,
+            "min": low + shift, "max": high + shift}
+
+# Q-Q points from a fixed number of quantiles, found by selection (np.quantile
+# partitions rather than sorts); returns theoretical and sample quantiles plus
+# the fitted line (slope, intercept, r) like probplot
+def qq_points(data, n_quantiles=1000, dist=norm, seed=0):
+    sample = diagnostic_sample(data, seed=seed)
+    probs = (np.arange(1, n_quantiles + 1) - 0.5) / n_quantiles
+    sample_quantiles = np.quantile(sample, probs)
+    theoretical = dist.ppf(probs)
+    slope, intercept = np.polyfit(theoretical, sample_quantiles, 1)
+    r = np.corrcoef(theoretical, sample_quantiles)[0, 1]
+    return theoretical, sample_quantiles, (slope, intercept, r)
+
+# Gaussian KDE by binning onto a grid and convolving with the kernel via FFT.
+# Returns grid centers, density, and the histogram counts/edges behind it.
+def fft_kde(data, grid_size=1024, bandwidth=None, seed=0):
+    data = diagnostic_points(data)
+    moments = summary_moments(data)
+    if bandwidth is None:
+        # Silverman's rule of thumb
+        q1, q3 = np.quantile(diagnostic_sample(data, seed=seed), [0.25, 0.75])
+        spread = min(np.sqrt(moments["variance"]), (q3 - q1) / 1.34) or np.sqrt(moments["variance"])
+        bandwidth = 0.9 * spread * moments["count"] ** (-0.2)
+    
+    # Pad the grid by 4 bandwidths so the circular convolution does not wrap
+    edges = np.linspace(moments["min"] - 4 * bandwidth, moments["max"] + 4 * bandwidth, grid_size + 1)
+    counts = np.zeros(grid_size)
+    for start in range(0, len(data), DIAGNOSTIC_BLOCK_SIZE):
+        counts += np.histogram(_finite_block(data[start:start + DIAGNOSTIC_BLOCK_SIZE]), bins=edges)[0]
+    
+    dx = edges[1] - edges[0]
+    frequencies = np.fft.rfftfreq(grid_size, d=dx)
+    kernel = np.exp(-0.5 * (2 * np.pi * frequencies * bandwidth) ** 2)
+    density = np.fft.irfft(np.fft.rfft(counts) * kernel, n=grid_size) / (moments["count"] * dx)
+    centers = (edges[:-1] + edges[1:]) / 2
+    return centers, np.clip(density, 0, None), counts, edges
+
+# Anderson–Darling normality statistic (estimated mean/std) with the
+# D'Agostino–Stephens p-value approximation
+def anderson_darling_normal(sample):
+    z = np.sort((sample - sample.mean()) / sample.std(ddof=1))
+    n = len(z)
+    i = np.arange(1, n + 1)
+    a2 = -n - np.sum((2 * i - 1) * (norm.logcdf(z) + norm.logsf(z[::-1]))) / n
+    a2_adj = a2 * (1 + 0.75 / n + 2.25 / n**2)
+    if a2_adj >= 10:
+        # Beyond the approximation's range; the p-value is below 1e-23
+        p_value = 0.0
+    elif a2_adj >= 0.6:
+        p_value = np.exp(1.2937 - 5.709 * a2_adj + 0.0186 * a2_adj**2)
+    elif a2_adj >= 0.34:
+        p_value = np.exp(0.9177 - 4.279 * a2_adj - 1.38 * a2_adj**2)
+    elif a2_adj >= 0.2:
+        p_value = 1 - np.exp(-8.318 + 42.796 * a2_adj - 59.938 * a2_adj**2)
+    else:
+        p_value = 1 - np.exp(-13.436 + 101.14 * a2_adj - 223.73 * a2_adj**2)
+    return a2, float(min(max(p_value, 0.0), 1.0))
+
+# Numerical normality diagnostics: moments and Jarque–Bera from one pass over
+# all points, Anderson–Darling on the bounded sample
+def normality_diagnostics(data, seed=0):
+    data = diagnostic_points(data)
+    stats = summary_moments(data)
+    stats["jarque_bera"] = stats["count"] / 6 * (stats["skewness"]**2 + stats["kurtosis"]**2 / 4)
+    sample = diagnostic_sample(data, seed=seed)
+    stats["anderson_darling"], stats["anderson_darling_pvalue"] = anderson_darling_normal(sample)
+    stats["anderson_darling_sample_size"] = len(sample)
+    return stats
+
+# Plot histogram with KDE curve (binned histogram + FFT KDE, so the cost
+# does not grow with the number of points drawn). The bars rebin the raw grid
+# counts; only the line is smoothed.
+def plot_distribution(data, title="Distribution", xlabel="Value", ylabel="Frequency", color='skyblue', bins=50):
+    centers, density, grid_counts, _ = fft_kde(data)
+    occupied = np.flatnonzero(grid_counts)
+    value_range = (centers[occupied[0]], centers[occupied[-1]])
+    counts, edges = np.histogram(centers, bins=bins, range=value_range, weights=grid_counts)
+    bin_width = edges[1] - edges[0]
+    n = grid_counts.sum()
+    
     plt.figure()
-    sns.histplot(data, kde=True, color=color)
+    plt.stairs(counts, edges, fill=True, color=color, alpha=0.6)
+    plt.plot(centers, density * n * bin_width, color=color)
     plt.title(title)
     plt.xlabel(xlabel)
     plt.ylabel(ylabel)
     plt.show()
 
-# Create a Q-Q plot for normality check
-def qq_plot(data, title="Q-Q Plot"):
+# Create a Q-Q plot for normality check from n_quantiles points
+def qq_plot(data, title="Q-Q Plot", n_quantiles=1000):
+    theoretical, sample_quantiles, (slope, intercept, r) = qq_points(data, n_quantiles)
     plt.figure()
-    probplot(data, plot=plt)
+    plt.plot(theoretical, sample_quantiles, 'o', markersize=3)
+    plt.plot(theoretical, slope * theoretical + intercept, 'r-', label=f"$R^2={r**2:.4f}$")
+    plt.xlabel("Theoretical quantiles")
+    plt.ylabel("Ordered Values")
     plt.title(title)
+    plt.legend()
     plt.show()
 
 # Detect outliers using Z-score method
@@ -53,6 +198,108 @@ def detect_outliers_iqr(data, multiplier=1.5):
     upper_bound = q3 + multiplier * iqr
     return np.where((data < lower_bound) | (data > upper_bound))[0]
 
+# Online Z-score / IQR outlier detection over a stream of chunks.
+# Each chunk (1D array, 2D array or DataFrame; columns are handled together)
+# is folded into the statistics first and then flagged, so feeding the whole
+# array as one chunk matches detect_outliers_zscore / detect_outliers_iqr.
+# Without a window, mean/variance are merged incrementally and quartiles
+# come from a uniform reservoir sample of reservoir_size rows; with window=N
+# the statistics cover only the most recent N rows. NaN/inf cells are left out
+# of each column's statistics (counts are kept per column) and NaN is never
+# flagged.
+class OnlineOutlierDetector:
+    
+    def __init__(self, method="zscore", threshold=3, multiplier=1.5, window=None,
+                    reservoir_size=10_000, seed=None):
+        if method not in ("zscore", "iqr"):
+            raise ValueError(f"Unknown method: {method}")
+        self.method = method
+        self.threshold = threshold
+        self.multiplier = multiplier
+        self.window = window
+        self.reservoir_size = reservoir_size
+        self.rng = np.random.default_rng(seed)
+        self.count = 0
+        self.mean = None
+        self.m2 = None
+        self.buffer = None
+        self.reservoir_keys = None
+    
+    # Fold the finite cells of a 2D chunk into per-column running count/mean/M2
+    # (parallel variance update)
+    def _update_moments(self, values):
+        finite = ~np.isnan(values)
+        n = finite.sum(axis=0)
+        chunk_mean = np.where(finite, values, 0.0).sum(axis=0) / np.maximum(n, 1)
+        chunk_m2 = (np.where(finite, values - chunk_mean, 0.0) ** 2).sum(axis=0)
+        if self.mean is None:
+            self.count, self.mean, self.m2 = n, chunk_mean, chunk_m2
+        else:
+            total = self.count + n
+            weight = n / np.maximum(total, 1)
+            delta = chunk_mean - self.mean
+            self.mean = self.mean + delta * weight
+            self.m2 = self.m2 + chunk_m2 + delta ** 2 * self.count * weight
+            self.count = total
+    
+    # Keep the rows with the smallest random keys: a uniform reservoir sample
+    def _update_reservoir(self, values):
+        keys = self.rng.random(len(values))
+        if self.buffer is not None:
+            values = np.concatenate([self.buffer, values])
+            keys = np.concatenate([self.reservoir_keys, keys])
+        if len(values) > self.reservoir_size:
+            keep = np.argpartition(keys, self.reservoir_size)[:self.reservoir_size]
+            values, keys = values[keep], keys[keep]
+        self.buffer, self.reservoir_keys = values, keys
+    
+    # Fold a chunk into the statistics
+    def _update(self, values):
+        if self.window:
+            if self.buffer is not None:
+                values = np.concatenate([self.buffer, values])
+            self.buffer = values[-self.window:]
+        elif self.method == "zscore":
+            self._update_moments(values)
+        else:
+            self._update_reservoir(values)
+    
+    # Current per-column (lower, upper) bounds outside which values are outliers.
+    # Buffered NaN cells are ignored; columns with no finite values get NaN
+    # bounds, so nothing in them is flagged.
+    def bounds(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            if self.method == "zscore":
+                if self.window:
+                    mean, std = np.nanmean(self.buffer, axis=0), np.nanstd(self.buffer, axis=0)
+                else:
+                    mean = np.where(self.count > 0, self.mean, np.nan)
+                    std = np.sqrt(self.m2 / np.maximum(self.count, 1))
+                # Constant columns have undefined z-scores and are never flagged
+                std = np.where(std > 0, std, np.inf)
+                return mean - self.threshold * std, mean + self.threshold * std
+            q1, q3 = np.nanpercentile(self.buffer, [25, 75], axis=0)
+        iqr = q3 - q1
+        return q1 - self.multiplier * iqr, q3 + self.multiplier * iqr
+    
+    # Update with a chunk and return its outlier flags (same shape as the chunk)
+    def update(self, chunk):
+        values = np.asarray(chunk, dtype=float)
+        one_dimensional = values.ndim == 1
+        values = values.reshape(len(values), -1)
+        
+        # Non-finite cells are stored as NaN so they stay out of the statistics
+        self._update(np.where(np.isfinite(values), values, np.nan))
+        lower, upper = self.bounds()
+        flags = (values < lower) | (values > upper)
+        
+        if isinstance(chunk, pd.DataFrame):
+            return pd.DataFrame(flags, index=chunk.index, columns=chunk.columns)
+        if isinstance(chunk, pd.Series):
+            return pd.Series(flags[:, 0], index=chunk.index, name=chunk.name)
+        return flags[:, 0] if one_dimensional else flags
+
 # Create a boxplot for outlier visualization
 def plot_boxplot(data, title="Boxplot", xlabel="", color='salmon'):
     plt.figure()
@@ -61,18 +308,74 @@ def plot_boxplot(data, title="Boxplot", xlabel="", color='salmon'):
     plt.xlabel(xlabel)
     plt.show()
 
-# Calculate binomial probability P(X=k)
+# Size limit for the cached log-factorial table (entries); larger n falls back to gammaln
+LOG_FACTORIAL_TABLE_LIMIT = 2**23
+_log_factorial_table = np.zeros(1)
+
+# Return log(k!) for scalar or array k, served from a cached table
+def log_factorial(k):
+    global _log_factorial_table
+    k = np.asarray(k, dtype=np.int64)
+    max_k = int(k.max()) if k.size else 0
+    if max_k >= len(_log_factorial_table):
+        if max_k >= LOG_FACTORIAL_TABLE_LIMIT:
+            return gammaln(k + 1.0)
+        # Grow geometrically so repeated calls with increasing n stay cheap
+        size = min(max(max_k + 1, 2 * len(_log_factorial_table)), LOG_FACTORIAL_TABLE_LIMIT)
+        _log_factorial_table = gammaln(np.arange(size) + 1.0)
+    return _log_factorial_table[k]
+
+# Calculate log P(X=k) for a Binomial(n, p); k may be an array (-inf outside 0..n)
+def log_binomial_probability(n, k, p):
+    k = np.asarray(k, dtype=np.int64)
+    valid = (k >= 0) & (k <= n)
+    k_safe = np.where(valid, k, 0)
+    log_comb = log_factorial(n) - log_factorial(k_safe) - log_factorial(n - k_safe)
+    log_pmf = log_comb + xlogy(k_safe, p) + xlog1py(n - k_safe, -p)
+    return np.where(valid, log_pmf, -np.inf)
+
+# Calculate binomial probability P(X=k) in log space (k may be an array)
 def binomial_probability(n, k, p):
-    return comb(n, k) * (p**k) * ((1-p)**(n-k))
+    return np.exp(log_binomial_probability(n, k, p))
+
+# Number of (n, p) CDF tables kept by binomial_cdf_table
+BINOMIAL_CDF_CACHE_SIZE = 16
+
+# Precompute P(X ≤ k) and P(X > k) for k = 0..n via the regularized incomplete
+# beta function; recent (n, p) pairs stay in an LRU cache
+@lru_cache(maxsize=BINOMIAL_CDF_CACHE_SIZE)
+def binomial_cdf_table(n, p):
+    k_values = np.arange(n + 1)
+    cdf = bdtr(k_values, n, p)
+    sf = bdtrc(k_values, n, p)
+    cdf.setflags(write=False)
+    sf.setflags(write=False)
+    return cdf, sf
 
 # Calculate cumulative binomial probability P(k_min ≤ X ≤ k_max)
+# O(1) per query once the (n, p) table exists; k_min/k_max may be arrays.
+# Differences are taken on the CDF below the mean and on the survival
+# function above it, so upper-tail intervals keep their precision.
 def binomial_cumulative(n, k_min, k_max, p):
-    return sum(binomial_probability(n, k, p) for k in range(k_min, k_max+1))
+    cdf, sf = binomial_cdf_table(n, p)
+    k_min = np.clip(np.asarray(k_min), 0, n + 1)
+    k_max = np.clip(np.asarray(k_max), -1, n)
+    
+    # Table value at k, or the limit value for k = -1
+    def lookup(table, k, at_minus_one):
+        return np.where(k >= 0, table[np.clip(k, 0, n)], at_minus_one)
+    
+    below = lookup(cdf, k_max, 0.0) - lookup(cdf, k_min - 1, 0.0)
+    above = lookup(sf, k_min - 1, 1.0) - lookup(sf, k_max, 1.0)
+    result = np.where(k_max < n * p, below, above)
+    result = np.where(k_min > k_max, 0.0, result)
+    # Scalar queries return a plain float, as before
+    return float(result) if result.ndim == 0 else result
 
 # Plot binomial PMF
 def plot_binomial(n, p, title="Binomial Distribution"):
     k_values = np.arange(0, n+1)
-    pmf = [binomial_probability(n, k, p) for k in k_values]
+    pmf = binomial_probability(n, k_values, p)
     
     plt.bar(k_values, pmf, color='lightgreen', edgecolor='black')
     plt.xlabel("Number of Successes")
@@ -93,9 +396,42 @@ def plot_normal(mu, sigma, x_range=None, title="Normal Distribution"):
     plt.title(f"{title} (μ={mu}, σ={sigma})")
     plt.show()
 
-# Demonstrate Central Limit Theorem
-def clt_demo(population, sample_size, n_samples=1000, title="CLT Demonstration"):
-    sample_means = [np.mean(np.random.choice(population, sample_size)) for _ in range(n_samples)]
+# Upper bound on resampled values materialized at once by bootstrap_statistic
+BOOTSTRAP_BLOCK_ELEMENTS = 5_000_000
+
+# Compute a statistic over n_samples resamples drawn with replacement.
+# Indices are drawn as (block × sample_size) matrices sized to stay under
+# BOOTSTRAP_BLOCK_ELEMENTS, and statistic is applied along axis=1 (np.mean,
+# np.median, np.std, ... or any function taking an axis argument). 2D data is
+# resampled by row, giving one statistic per column.
+def bootstrap_statistic(data, sample_size=None, n_samples=1000, statistic=np.mean, seed=None):
+    data = np.asarray(data)
+    sample_size = sample_size or len(data)
+    rng = np.random.default_rng(seed)
+    width = sample_size * int(np.prod(data.shape[1:], dtype=np.int64))
+    block = max(1, BOOTSTRAP_BLOCK_ELEMENTS // width)
+    
+    results = np.empty((n_samples,) + data.shape[1:])
+    for start in range(0, n_samples, block):
+        rows = min(block, n_samples - start)
+        indices = rng.integers(0, len(data), size=(rows, sample_size))
+        results[start:start + rows] = statistic(data[indices], axis=1)
+    return results
+
+# Percentile bootstrap confidence interval for a statistic
+def bootstrap_ci(data, statistic=np.mean, n_samples=1000, confidence=0.95, seed=None):
+    data = np.asarray(data)
+    replicates = bootstrap_statistic(data, n_samples=n_samples, statistic=statistic, seed=seed)
+    alpha = (1 - confidence) / 2
+    lower, upper = np.quantile(replicates, [alpha, 1 - alpha], axis=0)
+    return {"estimate": statistic(data, axis=0), "lower": lower, "upper": upper,
+            "std_error": replicates.std(axis=0, ddof=1)}
+
+# Demonstrate Central Limit Theorem; returns the simulated sample means
+def clt_demo(population, sample_size, n_samples=1000, title="CLT Demonstration", seed=None, plot=True):
+    sample_means = bootstrap_statistic(population, sample_size, n_samples, seed=seed)
+    if not plot:
+        return sample_means
     
     plt.hist(sample_means, bins=30, density=True, alpha=0.6, color='g', label='Sample Means')
     
@@ -109,13 +445,22 @@ def clt_demo(population, sample_size, n_samples=1000, title="CLT Demonstration")
     plt.ylabel("Density")
     plt.legend()
     plt.show()
+    return sample_means
 
-# Save dataset to CSV
+# Save dataset to CSV, or to .npy binary when filename ends in ".npy"
+# (numeric arrays only; column_name applies to CSV)
 def save_dataset(data, filename, column_name="value"):
+    if filename.endswith(".npy"):
+        np.save(filename, np.asarray(data))
+        return load_dataset(filename)
     df = pd.DataFrame({column_name: data})
     df.to_csv(filename, index=False)
     return df
 
-# Load dataset from CSV
-def load_dataset(filename):
+# Load dataset from CSV, or memory-map a ".npy" file. The memory-mapped array
+# opens instantly regardless of size, pages data in on access and can be
+# shared read-only between processes; mmap_mode=None reads it into memory.
+def load_dataset(filename, mmap_mode="r"):
+    if filename.endswith(".npy"):
+        return np.load(filename, mmap_mode=mmap_mode)
     return pd.read_csv(filename)
\ No newline at end of file
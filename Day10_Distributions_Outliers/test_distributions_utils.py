@@ -0,0 +1,62 @@
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from scipy.stats import binom
+
+import distributions_utils
+
+
+def test_plot_distribution_bars_show_data(monkeypatch):
+    monkeypatch.setattr(plt, "show", lambda: None)
+    rng = np.random.default_rng(0)
+    data = np.concatenate([rng.normal(0, 1, 20000), np.full(3000, 2.0)])
+    distributions_utils.plot_distribution(data)
+    bars = plt.gca().patches[0].get_data()
+    plt.close("all")
+    # Bars are counts of the data, so they add up to n and keep the spike
+    assert bars.values.sum() == len(data)
+    spike_bin = np.searchsorted(bars.edges, 2.0) - 1
+    assert bars.values[spike_bin] >= 3000
+
+
+def test_diagnostics_accept_nan_and_non_range_index(monkeypatch):
+    monkeypatch.setattr(plt, "show", lambda: None)
+    rng = np.random.default_rng(1)
+    series = pd.Series(rng.normal(5, 2, 5000))
+    series = series[series > 0].iloc[1:]
+    series.iloc[3] = np.nan
+    finite = series.dropna().to_numpy()
+    
+    moments = distributions_utils.summary_moments(series)
+    assert moments["count"] == len(finite)
+    assert np.isclose(moments["mean"], finite.mean())
+    assert np.isclose(moments["variance"], finite.var())
+    sample = distributions_utils.diagnostic_sample(series, max_size=100)
+    assert len(sample) <= 100 and np.isfinite(sample).all()
+    
+    distributions_utils.plot_distribution(series)
+    bars = plt.gca().patches[0].get_data()
+    plt.close("all")
+    assert bars.values.sum() == len(finite)
+    assert np.isfinite(distributions_utils.normality_diagnostics(series)["anderson_darling"])
+
+
+def test_online_detector_survives_nan():
+    rng = np.random.default_rng(0)
+    for method, window in [("zscore", None), ("iqr", None), ("zscore", 500), ("iqr", 500)]:
+        detector = distributions_utils.OnlineOutlierDetector(method=method, window=window, seed=0)
+        first = rng.normal(size=1000)
+        first[5] = np.nan
+        assert not detector.update(first)[5]
+        flags = detector.update(np.r_[rng.normal(size=100), 50.0, 100.0, np.nan])
+        assert flags[-3] and flags[-2] and not flags[-1]
+
+
+def test_binomial_cumulative_types():
+    value = distributions_utils.binomial_cumulative(20, 3, 8, 0.4)
+    assert type(value) is float
+    assert np.isclose(value, binom.cdf(8, 20, 0.4) - binom.cdf(2, 20, 0.4))
+    values = distributions_utils.binomial_cumulative(20, [0, 5], 10, 0.4)
+    assert isinstance(values, np.ndarray) and values.shape == (2,)
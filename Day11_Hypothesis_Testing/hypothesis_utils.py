@@ -1,8 +1,11 @@
 # Import necessary libraries
+import json
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
+from matplotlib.collections import LineCollection
 from scipy import stats
 
 # Generate and save all datasets needed for hypothesis testin
@@ -63,20 +66,54 @@ def perform_ztest(sample, pop_mean, pop_std):
     
     return z_score, p_value
 
-# Perform t-test (independent or paired) with visualizatio
-def perform_ttest(group1, group2, paired=False):
+# Pick at most max_pairs pair indices, favouring pairs in sparse regions of
+# the (group1, group2) plane so dense areas are thinned and outliers are kept.
+# Pairs with a NaN or infinite value are never picked (they cannot be drawn).
+def downsample_pairs(group1, group2, max_pairs=2000, bins=50, seed=0):
+    group1, group2 = np.asarray(group1, dtype=float), np.asarray(group2, dtype=float)
+    finite = np.flatnonzero(np.isfinite(group1) & np.isfinite(group2))
+    if len(finite) <= max_pairs:
+        return finite
+    x, y = group1[finite], group2[finite]
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins)
+    x_bin = np.clip(np.searchsorted(x_edges, x, side='right') - 1, 0, bins - 1)
+    y_bin = np.clip(np.searchsorted(y_edges, y, side='right') - 1, 0, bins - 1)
+    weights = 1.0 / counts[x_bin, y_bin]
+    rng = np.random.default_rng(seed)
+    return np.sort(rng.choice(finite, size=max_pairs, replace=False, p=weights / weights.sum()))
+
+# Draw the paired t-test plot: one LineCollection for all pair lines
+def plot_paired_ttest(group1, group2, max_pairs=2000, seed=0):
+    group1, group2 = np.asarray(group1), np.asarray(group2)
+    keep = downsample_pairs(group1, group2, max_pairs, seed=seed)
+    g1, g2 = group1[keep], group2[keep]
+    
+    plt.figure()
+    ax = plt.gca()
+    segments = np.stack([np.column_stack([np.ones(len(keep)), g1]),
+                        np.column_stack([np.full(len(keep), 2.0), g2])], axis=1)
+    ax.add_collection(LineCollection(segments, colors='gray', alpha=0.1))
+    ax.plot(np.ones(len(keep)), g1, 'bo', label='Group 1', alpha=0.5)
+    ax.plot(np.full(len(keep), 2.0), g2, 'ro', label='Group 2', alpha=0.5)
+    plt.xlim(0.5, 2.5)
+    plt.xticks([1, 2], ['Group 1', 'Group 2'])
+    title = 'Paired T-Test Visualization'
+    if len(keep) < len(group1):
+        title += f' ({len(keep)} of {len(group1)} pairs shown)'
+    plt.title(title)
+
+# Perform t-test (independent or paired) with optional visualization
+def perform_ttest(group1, group2, paired=False, plot=True, max_pairs=2000):
     if paired:
         t_stat, p_value = stats.ttest_rel(group1, group2)
-        plt.figure()
-        plt.plot([1]*len(group1), group1, 'bo', label='Group 1', alpha=0.5)
-        plt.plot([2]*len(group2), group2, 'ro', label='Group 2', alpha=0.5)
-        for i in range(len(group1)):
-            plt.plot([1, 2], [group1[i], group2[i]], 'gray', alpha=0.1)
-        plt.xlim(0.5, 2.5)
-        plt.xticks([1, 2], ['Group 1', 'Group 2'])
-        plt.title('Paired T-Test Visualization')
     else:
         t_stat, p_value = stats.ttest_ind(group1, group2)
+    if not plot:
+        return t_stat, p_value
+    
+    if paired:
+        plot_paired_ttest(group1, group2, max_pairs)
+    else:
         plt.figure()
         sns.boxplot(data=pd.DataFrame({
             'values': np.concatenate([group1, group2]),
@@ -128,6 +165,381 @@ def perform_chi2_test(contingency_table):
 
     return chi2, p, dof, expected
 
+# Adjust p-values for multiple comparisons ('holm', 'bh' or None). Only finite
+# p-values are adjusted (m counts just those); NaNs from degenerate tests stay NaN.
+def adjust_pvalues(p_values, method='holm'):
+    p_values = np.asarray(p_values, dtype=float)
+    if method is None:
+        return p_values
+    if method not in ('holm', 'bh'):
+        raise ValueError(f"Unknown correction method: {method}")
+    finite = np.flatnonzero(np.isfinite(p_values))
+    m = len(finite)
+    order = finite[np.argsort(p_values[finite])]
+    ranked = p_values[order]
+    if method == 'holm':
+        # Step-down: (m - i) * p_(i), made monotone non-decreasing
+        adjusted = np.maximum.accumulate((m - np.arange(m)) * ranked)
+    else:
+        # Step-up: m / i * p_(i), made monotone from the largest p-value down
+        adjusted = np.minimum.accumulate((m / np.arange(1, m + 1) * ranked)[::-1])[::-1]
+    result = np.full(len(p_values), np.nan)
+    result[order] = np.minimum(adjusted, 1.0)
+    return result
+
+# Reduce a long-format (keys..., group, value) table to per-group sufficient statistics
+def summarize_groups(data, keys='metric', group_col='group', value_col='value'):
+    keys = [keys] if isinstance(keys, str) else list(keys)
+    return (data.groupby(keys + [group_col], observed=True)[value_col]
+                .agg(count='count', mean='mean', var='var')
+                .reset_index())
+
+# Run vectorized two-sample tests for every metric (or metric/segment) at once.
+# Input is either a long-format table of raw values or a precomputed summary
+# with count, mean and var (sample variance) columns per group. test is
+# 'welch', 't' (pooled variance) or 'z'; the statistic is group1 - group2 as
+# in perform_ttest. Returns a results DataFrame; nothing is plotted.
+def batch_tests(data=None, summary=None, group1=None, group2=None, keys='metric',
+                group_col='group', value_col='value', test='welch',
+                correction='holm', alpha=0.05):
+    keys = [keys] if isinstance(keys, str) else list(keys)
+    if summary is None:
+        summary = summarize_groups(data, keys, group_col, value_col)
+    if group1 is None or group2 is None:
+        groups = sorted(summary[group_col].unique())
+        if len(groups) != 2:
+            raise ValueError("Specify group1 and group2 when there are not exactly two groups")
+        group1, group2 = groups
+    
+    first = summary[summary[group_col] == group1].set_index(keys)[['count', 'mean', 'var']]
+    second = summary[summary[group_col] == group2].set_index(keys)[['count', 'mean', 'var']]
+    paired = first.join(second, how='inner', lsuffix='1', rsuffix='2')
+    n1, m1, v1 = (paired[c].to_numpy(dtype=float) for c in ('count1', 'mean1', 'var1'))
+    n2, m2, v2 = (paired[c].to_numpy(dtype=float) for c in ('count2', 'mean2', 'var2'))
+    
+    diff = m1 - m2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if test == 'welch':
+            a, b = v1 / n1, v2 / n2
+            se = np.sqrt(a + b)
+            dof = (a + b) ** 2 / (a ** 2 / (n1 - 1) + b ** 2 / (n2 - 1))
+        elif test == 't':
+            dof = n1 + n2 - 2
+            pooled = ((n1 - 1) * v1 + (n2 - 1) * v2) / dof
+            se = np.sqrt(pooled * (1 / n1 + 1 / n2))
+        elif test == 'z':
+            se = np.sqrt(v1 / n1 + v2 / n2)
+            dof = np.full_like(diff, np.inf)
+        else:
+            raise ValueError(f"Unknown test: {test}")
+        statistic = diff / se
+    
+    if test == 'z':
+        p_values = 2 * stats.norm.sf(np.abs(statistic))
+    else:
+        p_values = 2 * stats.t.sf(np.abs(statistic), dof)
+    p_adjusted = adjust_pvalues(p_values, correction)
+    
+    results = paired.reset_index()
+    results['diff'] = diff
+    results['statistic'] = statistic
+    results['df'] = dof
+    results['p_value'] = p_values
+    results['p_adjusted'] = p_adjusted
+    results['reject'] = p_adjusted < alpha
+    return results
+
+# Convert (count, sum, sum of squares) into count, mean and sample variance.
+# Sums may be taken around a shift (e.g. a rough mean) to limit cancellation;
+# the variance is unaffected and the shift is added back to the mean.
+def moments_from_sums(count, total, total_sq, shift=0.0):
+    count = np.asarray(count, dtype=float)
+    total = np.asarray(total, dtype=float)
+    total_sq = np.asarray(total_sq, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = total / count
+        var = (total_sq - total * mean) / (count - 1)
+    return count, mean + shift, np.maximum(var, 0.0)
+
+# Add mean/var columns to a count/sum/sumsq summary so it can feed batch_tests
+def summary_from_sums(summary, shift=0.0):
+    summary = summary.copy()
+    _, summary['mean'], summary['var'] = moments_from_sums(
+        summary['count'], summary['sum'], summary['sumsq'], shift)
+    return summary
+
+# Independent t-test from sufficient statistics (arrays test many pairs at once)
+def ttest_from_sums(n1, sum1, sumsq1, n2, sum2, sumsq2, equal_var=True, shift=0.0):
+    n1, m1, v1 = moments_from_sums(n1, sum1, sumsq1, shift)
+    n2, m2, v2 = moments_from_sums(n2, sum2, sumsq2, shift)
+    if equal_var:
+        dof = n1 + n2 - 2
+        se = np.sqrt(((n1 - 1) * v1 + (n2 - 1) * v2) / dof * (1 / n1 + 1 / n2))
+    else:
+        a, b = v1 / n1, v2 / n2
+        se = np.sqrt(a + b)
+        dof = (a + b) ** 2 / (a ** 2 / (n1 - 1) + b ** 2 / (n2 - 1))
+    t_stat = (m1 - m2) / se
+    p_value = 2 * stats.t.sf(np.abs(t_stat), dof)
+    return t_stat, p_value
+
+# Paired t-test from the moments of the differences (group1 - group2)
+def paired_ttest_from_sums(n, sum_diff, sumsq_diff):
+    n, mean, var = moments_from_sums(n, sum_diff, sumsq_diff)
+    t_stat = mean / np.sqrt(var / n)
+    p_value = 2 * stats.t.sf(np.abs(t_stat), n - 1)
+    return t_stat, p_value
+
+# Compute count, sum and sum of squares per group in-database with one GROUP BY.
+# keys adds extra grouping columns (e.g. metric, segment); where is an optional
+# SQL filter. Values are cast to REAL so large integer sums cannot overflow.
+def sql_sufficient_stats(conn, table, value_col, group_col, keys=None, where=None, shift=0.0):
+    keys = [keys] if isinstance(keys, str) else list(keys or [])
+    group_cols = ", ".join(keys + [group_col])
+    value = f"(CAST({value_col} AS REAL) - {float(shift)})"
+    query = f"""
+    SELECT {group_cols},
+        COUNT({value_col}) AS count,
+        SUM({value}) AS sum,
+        SUM({value} * {value}) AS sumsq
+    FROM {table}
+    WHERE {value_col} IS NOT NULL {f'AND ({where})' if where else ''}
+    GROUP BY {group_cols}
+    """
+    return pd.read_sql_query(query, conn)
+
+# Compute paired-difference moments (before - after) in-database with one query
+def sql_paired_stats(conn, table, before_col, after_col, keys=None, where=None):
+    keys = [keys] if isinstance(keys, str) else list(keys or [])
+    diff = f"(CAST({before_col} AS REAL) - {after_col})"
+    select_keys = "".join(f"{key}, " for key in keys)
+    group_by = f"GROUP BY {', '.join(keys)}" if keys else ""
+    query = f"""
+    SELECT {select_keys}
+        COUNT(*) AS count,
+        SUM({diff}) AS sum,
+        SUM({diff} * {diff}) AS sumsq
+    FROM {table}
+    WHERE {before_col} IS NOT NULL AND {after_col} IS NOT NULL {f'AND ({where})' if where else ''}
+    {group_by}
+    """
+    return pd.read_sql_query(query, conn)
+
+# Group-sequential critical values for two-sided tests at the given
+# information fractions. 'obrien_fleming' boundaries are c / sqrt(t) and
+# 'pocock' are constant; c is calibrated by simulating the Brownian motion of
+# the z-statistic so the overall type I error equals alpha.
+def group_sequential_boundaries(information_fractions, alpha=0.05, kind='obrien_fleming',
+                                n_sims=200_000, seed=0):
+    t = np.asarray(information_fractions, dtype=float)
+    rng = np.random.default_rng(seed)
+    increments = rng.standard_normal((n_sims, len(t))) * np.sqrt(np.diff(t, prepend=0.0))
+    z = np.cumsum(increments, axis=1) / np.sqrt(t)
+    if kind == 'obrien_fleming':
+        shape = 1 / np.sqrt(t)
+    elif kind == 'pocock':
+        shape = np.ones_like(t)
+    else:
+        raise ValueError(f"Unknown boundary kind: {kind}")
+    c = np.quantile(np.max(np.abs(z) / shape, axis=1), 1 - alpha)
+    return c * shape
+
+# Streaming two-group monitor for many metrics with always-valid p-values.
+# Each metric keeps only counts, sums and sums of squares per group plus its
+# running p-value, so updates cost O(new rows) and state is O(1) per metric.
+# p-values come from the normal mixture SPRT (mixing variance tau**2 on the
+# mean difference) and stay valid under continuous monitoring. With
+# planned_n and looks (information fractions), group-sequential boundaries
+# are also checked on the z-statistic.
+class SequentialMonitor:
+    
+    STATE_COLUMNS = ['n1', 'sum1', 'sumsq1', 'n2', 'sum2', 'sumsq2', 'p_value']
+    
+    def __init__(self, group1, group2, tau=1.0, alpha=0.05, planned_n=None, looks=None,
+                    boundary_kind='obrien_fleming'):
+        self.group1 = group1
+        self.group2 = group2
+        self.tau = tau
+        self.alpha = alpha
+        self.planned_n = planned_n
+        self.looks = None if looks is None else list(looks)
+        self.boundary_kind = boundary_kind
+        self.boundaries = None
+        if planned_n is not None and looks is not None:
+            self.boundaries = group_sequential_boundaries(self.looks, alpha, boundary_kind)
+        self.state = pd.DataFrame(columns=self.STATE_COLUMNS, dtype=float)
+    
+    # Fold a batch of long-format events (metric, group, value) into the state
+    def update(self, batch, metric_col='metric', group_col='group', value_col='value'):
+        values = batch[value_col].astype(float)
+        sums = (batch.assign(_value=values, _sq=values ** 2)
+                    .groupby([metric_col, group_col], observed=True)
+                    .agg(n=('_value', 'count'), sum=('_value', 'sum'), sumsq=('_sq', 'sum'))
+                    .unstack(group_col, fill_value=0.0))
+        delta = pd.DataFrame(0.0, index=sums.index, columns=self.STATE_COLUMNS[:-1])
+        for group, suffix in ((self.group1, '1'), (self.group2, '2')):
+            for stat in ('n', 'sum', 'sumsq'):
+                if (stat, group) in sums.columns:
+                    delta[stat + suffix] = sums[(stat, group)]
+        
+        state = self.state.reindex(self.state.index.union(delta.index))
+        state['p_value'] = state['p_value'].fillna(1.0)
+        state[delta.columns] = state[delta.columns].fillna(0.0).add(delta, fill_value=0.0)
+        
+        # Always-valid p-value: running minimum of 1 / mixture likelihood ratio
+        _, m1, v1 = moments_from_sums(state['n1'], state['sum1'], state['sumsq1'])
+        _, m2, v2 = moments_from_sums(state['n2'], state['sum2'], state['sumsq2'])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            v = v1 / state['n1'] + v2 / state['n2']
+            tau2 = self.tau ** 2
+            log_lr = 0.5 * np.log(v / (v + tau2)) + tau2 * (m1 - m2) ** 2 / (2 * v * (v + tau2))
+        p_now = np.where(np.isfinite(log_lr), np.minimum(1.0, np.exp(-log_lr)), 1.0)
+        state['p_value'] = np.minimum(state['p_value'], p_now)
+        self.state = state
+        return self.results()
+    
+    # Current estimates, z-statistics and decisions per metric
+    def results(self):
+        state = self.state
+        _, m1, v1 = moments_from_sums(state['n1'], state['sum1'], state['sumsq1'])
+        _, m2, v2 = moments_from_sums(state['n2'], state['sum2'], state['sumsq2'])
+        results = pd.DataFrame({'n1': state['n1'], 'n2': state['n2'], 'diff': m1 - m2}, index=state.index)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            results['z'] = results['diff'] / np.sqrt(v1 / state['n1'] + v2 / state['n2'])
+        results['p_value'] = state['p_value']
+        results['reject'] = state['p_value'] < self.alpha
+        if self.boundaries is not None:
+            information = (state['n1'] + state['n2']) / self.planned_n
+            look = np.searchsorted(self.looks, information, side='right') - 1
+            boundary = np.where(look >= 0, self.boundaries[np.clip(look, 0, None)], np.inf)
+            results['information'] = information
+            results['boundary'] = boundary
+            results['boundary_crossed'] = np.abs(results['z']) >= boundary
+        return results
+    
+    # Write parameters and per-metric state to a JSON checkpoint
+    def save(self, path):
+        params = {'group1': self.group1, 'group2': self.group2, 'tau': self.tau,
+                    'alpha': self.alpha, 'planned_n': self.planned_n, 'looks': self.looks,
+                    'boundary_kind': self.boundary_kind}
+        with open(path, 'w') as f:
+            json.dump({'params': params, 'state': json.loads(self.state.to_json(orient='split'))}, f)
+    
+    # Restore a monitor from a JSON checkpoint
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            checkpoint = json.load(f)
+        monitor = cls(**checkpoint['params'])
+        state = checkpoint['state']
+        monitor.state = pd.DataFrame(state['data'], index=state['index'],
+                                        columns=state['columns'], dtype=float)
+        return monitor
+
+# Upper bound on values materialized per resampling block
+RESAMPLE_BLOCK_ELEMENTS = 5_000_000
+
+# |mean1 - mean2| for a block of label permutations of the pooled sample
+def _permutation_block(data, size, rng):
+    pooled, n1 = data
+    permuted = rng.permuted(np.broadcast_to(pooled, (size, len(pooled))), axis=1)
+    return np.abs(permuted[:, :n1].mean(axis=1) - permuted[:, n1:].mean(axis=1))
+
+# |mean1 - mean2| for a block of bootstraps drawn from null-shifted groups
+def _bootstrap_block(data, size, rng):
+    shifted1, shifted2 = data
+    means1 = shifted1[rng.integers(0, len(shifted1), (size, len(shifted1)))].mean(axis=1)
+    means2 = shifted2[rng.integers(0, len(shifted2), (size, len(shifted2)))].mean(axis=1)
+    return np.abs(means1 - means2)
+
+# Chi-squared statistic for a block of column-label permutations
+def _chi2_block(data, size, rng):
+    row_labels, col_labels, shape, expected = data
+    n_cells = shape[0] * shape[1]
+    permuted = rng.permuted(np.broadcast_to(col_labels, (size, len(col_labels))), axis=1)
+    cells = row_labels * shape[1] + permuted + (np.arange(size) * n_cells)[:, np.newaxis]
+    tables = np.bincount(cells.ravel(), minlength=size * n_cells).reshape(size, *shape)
+    return ((tables - expected) ** 2 / expected).sum(axis=(1, 2))
+
+# Count resampled statistics at least as extreme as observed in one block
+def _count_extreme(block_fn, data, observed, size, seed_seq):
+    return int(np.count_nonzero(block_fn(data, size, np.random.default_rng(seed_seq)) >= observed))
+
+# Run resampling blocks and return (p_value, resamples used).
+# Every block has its own SeedSequence.spawn child, so results are identical
+# for any n_workers. In adaptive mode blocks run in rounds of n_workers and
+# stop once the p-value's 95% half-width is below precision or alpha lies
+# clearly (99% level) outside its interval.
+def _run_resampling(block_fn, data, observed, n_resamples, block_size, n_workers,
+                    seed, adaptive, precision, alpha):
+    sizes = [min(block_size, n_resamples - start) for start in range(0, n_resamples, block_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    round_size = n_workers if adaptive else len(sizes)
+    pool = ProcessPoolExecutor(max_workers=n_workers) if n_workers > 1 else None
+    
+    extreme, used = 0, 0
+    try:
+        for start in range(0, len(sizes), round_size):
+            blocks = range(start, min(start + round_size, len(sizes)))
+            args = ([block_fn] * len(blocks), [data] * len(blocks), [observed] * len(blocks),
+                    [sizes[i] for i in blocks], [seeds[i] for i in blocks])
+            counts = pool.map(_count_extreme, *args) if pool else map(_count_extreme, *args)
+            extreme += sum(counts)
+            used += sum(sizes[i] for i in blocks)
+            if adaptive:
+                p_value = (extreme + 1) / (used + 1)
+                se = np.sqrt(p_value * (1 - p_value) / used)
+                if 1.96 * se <= precision or abs(p_value - alpha) > 2.576 * se:
+                    break
+    finally:
+        if pool:
+            pool.shutdown()
+    return (extreme + 1) / (used + 1), used
+
+# Resamples per block, capped so a block stays under RESAMPLE_BLOCK_ELEMENTS values
+def _block_rows(block_size, width):
+    return max(1, min(block_size, RESAMPLE_BLOCK_ELEMENTS // max(width, 1)))
+
+# Two-sided permutation test for a difference in means (perform_ttest-style)
+def permutation_test(group1, group2, n_resamples=10_000, block_size=1000, n_workers=1,
+                        seed=None, adaptive=False, precision=0.005, alpha=0.05):
+    group1, group2 = np.asarray(group1, dtype=float), np.asarray(group2, dtype=float)
+    observed = group1.mean() - group2.mean()
+    pooled = np.concatenate([group1, group2])
+    block_size = _block_rows(block_size, len(pooled))
+    p_value, used = _run_resampling(_permutation_block, (pooled, len(group1)), abs(observed),
+                                    n_resamples, block_size, n_workers, seed, adaptive, precision, alpha)
+    return observed, p_value, used
+
+# Two-sided bootstrap test for a difference in means. Each group is shifted to
+# the pooled mean so resampling happens under the null (unequal variances kept).
+def bootstrap_test(group1, group2, n_resamples=10_000, block_size=1000, n_workers=1,
+                    seed=None, adaptive=False, precision=0.005, alpha=0.05):
+    group1, group2 = np.asarray(group1, dtype=float), np.asarray(group2, dtype=float)
+    observed = group1.mean() - group2.mean()
+    pooled_mean = np.concatenate([group1, group2]).mean()
+    data = (group1 - group1.mean() + pooled_mean, group2 - group2.mean() + pooled_mean)
+    block_size = _block_rows(block_size, len(group1) + len(group2))
+    p_value, used = _run_resampling(_bootstrap_block, data, abs(observed),
+                                    n_resamples, block_size, n_workers, seed, adaptive, precision, alpha)
+    return observed, p_value, used
+
+# Permutation chi-squared test of independence for a contingency table laid
+# out like perform_chi2_test's input (first column holds the row labels)
+def chi2_permutation_test(contingency_table, n_resamples=10_000, block_size=1000, n_workers=1,
+                            seed=None, adaptive=False, precision=0.005, alpha=0.05):
+    observed_values = contingency_table.iloc[:, 1:].values.astype(np.int64)
+    chi2, _, _, expected = stats.chi2_contingency(observed_values, correction=False)
+    rows, cols = np.indices(observed_values.shape)
+    row_labels = np.repeat(rows.ravel(), observed_values.ravel())
+    col_labels = np.repeat(cols.ravel(), observed_values.ravel())
+    data = (row_labels, col_labels, observed_values.shape, expected)
+    block_size = _block_rows(block_size, len(row_labels))
+    # Small tolerance so permutations reproducing the observed table count as extreme
+    p_value, used = _run_resampling(_chi2_block, data, chi2 - 1e-9,
+                                    n_resamples, block_size, n_workers, seed, adaptive, precision, alpha)
+    return chi2, p_value, used
+
 # Helper function to save plot
 def save_plot(title, filename):
     plt.title(title)
@@ -0,0 +1,47 @@
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from hypothesis_utils import adjust_pvalues, batch_tests, downsample_pairs, perform_ttest
+
+
+def test_adjust_pvalues_ignores_nan():
+    p_values = np.array([0.01, np.nan, 0.04, 0.03, 0.5])
+    finite = p_values[~np.isnan(p_values)]
+    for method in ('holm', 'bh'):
+        adjusted = adjust_pvalues(p_values, method)
+        assert np.isnan(adjusted[1])
+        np.testing.assert_allclose(adjusted[~np.isnan(p_values)], adjust_pvalues(finite, method))
+    np.testing.assert_allclose(adjust_pvalues(finite, 'holm'), [0.04, 0.09, 0.09, 0.5])
+    np.testing.assert_allclose(adjust_pvalues(finite, 'bh'), [0.04, 0.04 * 4 / 3, 0.04 * 4 / 3, 0.5])
+
+
+def test_batch_tests_with_degenerate_metric():
+    rng = np.random.default_rng(0)
+    frames = []
+    for i in range(6):
+        n = 1 if i == 5 else 50
+        shift = 1.0 if i == 0 else 0.0
+        frames.append(pd.DataFrame({'metric': f'm{i}', 'group': 'A', 'value': rng.normal(shift, 1, n)}))
+        frames.append(pd.DataFrame({'metric': f'm{i}', 'group': 'B', 'value': rng.normal(0, 1, 50)}))
+    results = batch_tests(pd.concat(frames), correction='bh').set_index('metric')
+    assert np.isnan(results.loc['m5', 'p_adjusted'])
+    assert not results.loc['m5', 'reject']
+    assert results.drop(index='m5')['p_adjusted'].notna().all()
+    assert results.loc['m0', 'reject']
+
+
+def test_paired_plot_skips_nan_pairs(monkeypatch):
+    monkeypatch.setattr(plt, 'show', lambda: None)
+    rng = np.random.default_rng(0)
+    before = rng.normal(10, 2, 5000)
+    after = before + rng.normal(0.5, 1, 5000)
+    after[[3, 40]] = np.nan
+    
+    keep = downsample_pairs(before, after, max_pairs=2000)
+    assert len(keep) == 2000
+    assert np.isfinite(after[keep]).all()
+    perform_ttest(before, after, paired=True, max_pairs=2000)
+    plt.close('all')
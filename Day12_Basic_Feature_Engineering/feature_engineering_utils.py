@@ -1,6 +1,11 @@
 # Import necessary libraries
+import hashlib
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import pandas as pd
+from scipy import sparse
 from sklearn.preprocessing import LabelEncoder, StandardScaler, MinMaxScaler
 from sklearn.feature_selection import mutual_info_regression
 
@@ -28,15 +33,29 @@ def handle_missing_values(data):
     return data.dropna()
 
 # 2. Date Feature Utilities
+# Parse dates once per distinct value; returns the parsed uniques and the
+# per-row codes that map each row back to them
+def parse_dates_cached(values, date_format='%d/%m/%Y'):
+    codes, uniques = pd.factorize(values)
+    dates = pd.to_datetime(pd.Index(uniques), format=date_format)
+    if (codes < 0).any():
+        # Missing dates map to a trailing NaT slot
+        dates = dates.append(pd.DatetimeIndex([pd.NaT]))
+        codes = np.where(codes < 0, len(uniques), codes)
+    return dates, codes
+
 # Generate temporal features from datetime column
-def create_date_features(data, date_cols):
+def create_date_features(data, date_cols, date_format='%d/%m/%Y'):
     for col, prefix in date_cols.items():
         if col in data.columns:
-            data[col] = pd.to_datetime(data[col], format='%d/%m/%Y')
-            data[f'{prefix}Year'] = data[col].dt.year
-            data[f'{prefix}MonthSin'] = np.sin(2 * np.pi * data[col].dt.month/12)
-            data[f'{prefix}MonthCos'] = np.cos(2 * np.pi * data[col].dt.month/12)
-            data[f'{prefix}Weekday'] = data[col].dt.weekday
+            # Features are computed on the distinct dates and broadcast by code
+            dates, codes = parse_dates_cached(data[col], date_format)
+            month = np.asarray(dates.month)
+            data[col] = np.asarray(dates).take(codes)
+            data[f'{prefix}Year'] = np.asarray(dates.year).take(codes)
+            data[f'{prefix}MonthSin'] = np.sin(2 * np.pi * month/12).take(codes)
+            data[f'{prefix}MonthCos'] = np.cos(2 * np.pi * month/12).take(codes)
+            data[f'{prefix}Weekday'] = np.asarray(dates.weekday).take(codes)
     return data
 
 # Calculate duration between two date
@@ -45,17 +64,138 @@ def calculate_time_delta(data, start_col, end_col, new_col):
     return data
 
 # 3. Encoding Utilities
-# One-hot encode categorical feature
-def one_hot_encode(data, column, prefix=None):
-    prefix = prefix or column
-    dummies = pd.get_dummies(data[column], prefix=prefix)
-    return pd.concat([data, dummies], axis=1)
+# Sparse one-hot encoder for several columns at once. Categories are learned
+# in fit(); at transform time unseen categories become all-zero rows
+# (handle_unknown='ignore') or raise (handle_unknown='error').
+class SparseOneHotEncoder:
+    
+    def __init__(self, categories=None, prefix=None, handle_unknown='ignore'):
+        if handle_unknown not in ('ignore', 'error'):
+            raise ValueError("handle_unknown must be 'ignore' or 'error'")
+        self.categories = categories
+        self.prefix = prefix or {}
+        self.handle_unknown = handle_unknown
+    
+    # Learn the sorted categories of each column (missing values excluded)
+    def fit(self, data, columns):
+        columns = [columns] if isinstance(columns, str) else list(columns)
+        self.categories = {col: pd.Index(np.sort(data[col].dropna().unique())) for col in columns}
+        return self
+    
+    @property
+    def feature_names(self):
+        return [f'{self.prefix.get(col, col)}_{category}'
+                for col, categories in self.categories.items() for category in categories]
+    
+    # Encode to a CSR matrix with one block of columns per input column
+    def transform(self, data):
+        n_rows = len(data)
+        codes = np.empty((n_rows, len(self.categories)), dtype=np.intp)
+        offset = 0
+        for j, (col, categories) in enumerate(self.categories.items()):
+            col_codes = categories.get_indexer(data[col])
+            if self.handle_unknown == 'error':
+                unknown = (col_codes < 0) & data[col].notna().to_numpy()
+                if unknown.any():
+                    raise ValueError(f"Unknown categories in column '{col}': "
+                                        f"{list(pd.unique(data[col][unknown])[:5])}")
+            codes[:, j] = np.where(col_codes >= 0, col_codes + offset, -1)
+            offset += len(categories)
+        
+        # Rows hold at most one entry per column, already in column order, so
+        # the CSR arrays come straight from the code matrix without sorting
+        present = codes >= 0
+        indptr = np.concatenate([[0], np.cumsum(present.sum(axis=1))])
+        indices = codes[present]
+        values = np.ones(len(indices), dtype=bool)
+        return sparse.csr_matrix((values, indices, indptr), shape=(n_rows, offset))
+    
+    # Encode to a frame of pandas sparse bool columns aligned with data
+    def transform_frame(self, data):
+        return pd.DataFrame.sparse.from_spmatrix(self.transform(data), index=data.index,
+                                                    columns=self.feature_names)
+    
+    # Return data with the sparse columns appended in one concat; under
+    # copy-on-write the base frame's columns are shared, not copied
+    def encode_into(self, data):
+        return pd.concat([data, self.transform_frame(data)], axis=1)
+
+# One-hot encode one or more categorical features as sparse columns
+def one_hot_encode(data, columns, prefix=None):
+    columns = [columns] if isinstance(columns, str) else list(columns)
+    if isinstance(prefix, str):
+        prefix = {columns[0]: prefix}
+    encoder = SparseOneHotEncoder(prefix=prefix).fit(data, columns)
+    return encoder.encode_into(data)
+
+# Smoothed target encoder: categories are factorized once and encodings are
+# stored as an array indexed by category code. Training rows get K-fold
+# out-of-fold means so a row's own target never leaks into its encoding.
+class TargetEncoder:
+    
+    def __init__(self, smoothing=10, n_folds=5, seed=0):
+        self.smoothing = smoothing
+        self.n_folds = n_folds
+        self.seed = seed
+        self.categories = None
+        self.encoding = None
+        self.prior = None
+    
+    # Learn the full-data smoothed means. Missing categories are counted in a
+    # trailing bucket so their targets still contribute to the prior.
+    def _fit(self, values, target):
+        codes, uniques = pd.factorize(values)
+        k = len(uniques)
+        codes = np.where(codes >= 0, codes, k)
+        target = np.asarray(target, dtype=float)
+        valid = ~np.isnan(target)
+        sums = np.bincount(codes[valid], weights=target[valid], minlength=k + 1)
+        counts = np.bincount(codes[valid], minlength=k + 1)
+        self.categories = pd.Index(uniques)
+        self.prior = sums.sum() / counts.sum()
+        self.encoding = (sums[:k] + self.smoothing * self.prior) / (counts[:k] + self.smoothing)
+        return codes, target, valid
+    
+    def fit(self, values, target):
+        self._fit(values, target)
+        return self
+    
+    # Fit and return out-of-fold encodings for the training rows
+    def fit_transform(self, values, target):
+        codes, target, valid = self._fit(values, target)
+        k, n_folds = len(self.categories), self.n_folds
+        if n_folds <= 1:
+            return self._lookup(np.where(codes < k, codes, -1))
+        
+        # Per (category, fold) sums and counts from one bincount each
+        folds = np.random.default_rng(self.seed).permutation(len(codes)) % n_folds
+        cells = codes * n_folds + folds
+        size = (k + 1) * n_folds
+        sums = np.bincount(cells[valid], weights=target[valid], minlength=size).reshape(k + 1, n_folds)
+        counts = np.bincount(cells[valid], minlength=size).reshape(k + 1, n_folds)
+        
+        # Out-of-fold statistics are the totals minus the row's own fold
+        fold_sums, fold_counts = sums.sum(axis=0), counts.sum(axis=0)
+        prior = (fold_sums.sum() - fold_sums) / np.maximum(fold_counts.sum() - fold_counts, 1)
+        oof_sums = sums.sum(axis=1, keepdims=True) - sums
+        oof_counts = counts.sum(axis=1, keepdims=True) - counts
+        encoding = (oof_sums + self.smoothing * prior) / (oof_counts + self.smoothing)
+        encoding[k] = prior
+        
+        return encoding[codes, folds]
+    
+    # Encode new values; unseen or missing categories get the prior
+    def transform(self, values):
+        return self._lookup(self.categories.get_indexer(values))
+    
+    def _lookup(self, codes):
+        # Code -1 indexes the trailing prior slot
+        return np.append(self.encoding, self.prior).take(codes)
 
 # Target encoding for high-cardinality feature
-def target_encode(data, column, target='Sales'):
-    mean = data[target].mean()
-    encodings = data.groupby(column)[target].mean().to_dict()
-    data[f'TargetEnc_{column}'] = data[column].map(encodings).fillna(mean)
+def target_encode(data, column, target='Sales', smoothing=10, n_folds=5, seed=0):
+    encoder = TargetEncoder(smoothing, n_folds, seed)
+    data[f'TargetEnc_{column}'] = encoder.fit_transform(data[column], data[target])
     return data
 
 # 4. Transformation Utilities
@@ -77,20 +217,34 @@ def create_interaction(data, col1, col2, new_col):
     data[new_col] = data[col1] / (data[col2] + 1)  # +1 to avoid division by zero
     return data
 
-# Create aggregated feature
-def create_aggregates(data, group_col, agg_cols):
-    agg_funcs = {
-        'mean': np.mean,
-        'count': 'count',
-        'sum': np.sum,
-        'max': np.max,
-        'min': np.min
-    }
+# Cythonized aggregations used for group features
+AGGREGATE_FUNCS = ('mean', 'count', 'sum', 'max', 'min')
+
+# Aggregate table for one (possibly compound) group key, plus the group code
+# of every row (-1 where the key is missing)
+def aggregate_table(data, group_col, agg_cols, funcs=AGGREGATE_FUNCS):
+    keys = [group_col] if isinstance(group_col, str) else list(group_col)
+    grouped = data.groupby(keys if len(keys) > 1 else keys[0], sort=False)
+    codes = grouped.ngroup().fillna(-1).to_numpy(dtype=np.intp)
+    aggregates = grouped[list(agg_cols)].agg(list(funcs))
+    name = '_'.join(keys)
+    aggregates.columns = [f'{name}_{"_".join(col)}' for col in aggregates.columns]
+    return aggregates, codes
+
+# Create aggregated features for one or more group keys in one call; results
+# are broadcast back by group code instead of merged, so the frame is not copied
+def create_aggregates(data, group_cols, agg_cols, funcs=AGGREGATE_FUNCS):
+    if isinstance(group_cols, str) or not isinstance(group_cols, list):
+        group_cols = [group_cols]
     
-    aggregates = data.groupby(group_col)[agg_cols].agg(agg_funcs)
-    aggregates.columns = [f'{group_col}_{"_".join(col)}' for col in aggregates.columns]
+    for group_col in group_cols:
+        aggregates, codes = aggregate_table(data, group_col, agg_cols, funcs)
+        # Trailing NaN row so that code -1 (missing key) takes NaN
+        values = aggregates.to_numpy(dtype=float)
+        values = np.vstack([values, np.full(values.shape[1], np.nan)])
+        data[list(aggregates.columns)] = values.take(codes, axis=0)
     
-    return data.merge(aggregates, on=group_col, how='left')
+    return data
 
 # 6. Analysis Utilities
 # Get top correlated features with targe
@@ -98,14 +252,250 @@ def get_feature_correlations(data, target_col, n=10):
     corr_matrix = data.select_dtypes(include=np.number).corr()
     return corr_matrix[target_col].sort_values(ascending=False)[1:n+1]
 
+# Mutual-information scores keyed by column/target sample fingerprint
+MI_SCORE_CACHE = {}
+
+# Row sample stratified on target quantiles: each of n_strata bins keeps its
+# share of the rows, picked at random within the bin. For a fixed seed the
+# samples are nested, so growing size only adds rows.
+def stratified_sample(target, size, n_strata=10, seed=0):
+    target = np.asarray(target, dtype=float)
+    n_rows = len(target)
+    if size >= n_rows:
+        return np.arange(n_rows)
+    
+    strata = np.empty(n_rows, dtype=np.intp)
+    strata[np.argsort(target, kind='stable')] = np.arange(n_rows) * n_strata // n_rows
+    order = np.lexsort((np.random.default_rng(seed).random(n_rows), strata))
+    counts = np.bincount(strata, minlength=n_strata)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    quotas = np.round(counts * size / n_rows).astype(np.intp)
+    position = np.arange(n_rows) - starts[strata[order]]
+    return np.sort(order[position < quotas[strata[order]]])
+
+# Score every column of a chunk on its own, so a column's score does not
+# depend on which chunk it lands in
+def _mutual_info_chunk(X, y, n_neighbors, seed):
+    return [mutual_info_regression(X[:, [j]], y, n_neighbors=n_neighbors, random_state=seed)[0]
+            for j in range(X.shape[1])]
+
+# Rank numeric features by mutual information with the target. Columns are
+# scored in chunks across n_workers processes on a stratified row sample that
+# doubles (up to max_sample_size) until no score moves by more than tol or the
+# next round would overrun time_budget seconds. Scores are cached per column
+# sample fingerprint, so unchanged columns are not rescored.
+def rank_mutual_info(data, target_col, sample_size=10_000, max_sample_size=None, tol=0.01,
+                        time_budget=None, n_workers=1, chunk_size=50, n_neighbors=3, seed=0,
+                        cache=MI_SCORE_CACHE):
+    columns = [col for col in data.select_dtypes(include=np.number).columns if col != target_col]
+    positions = data.columns.get_indexer(columns)
+    target = data[target_col].to_numpy(dtype=float)
+    max_sample_size = min(max_sample_size or len(target), len(target))
+    size = min(sample_size, max_sample_size)
+    cache = {} if cache is None else cache
+    pool = ProcessPoolExecutor(max_workers=n_workers) if n_workers > 1 else None
+    
+    start, previous = time.perf_counter(), None
+    try:
+        while True:
+            round_start = time.perf_counter()
+            rows = stratified_sample(target, size, seed=seed)
+            y = target[rows]
+            # Only the sampled rows are gathered; NaNs are zeroed in a new array
+            # (the gathered block may be a read-only view under copy-on-write)
+            X = data.iloc[rows, positions].to_numpy(dtype=float, na_value=np.nan)
+            X = np.nan_to_num(X, nan=0.0, posinf=np.inf, neginf=-np.inf)
+            
+            suffix = hashlib.blake2b(y.tobytes(), digest_size=16).hexdigest() + f'/{n_neighbors}/{seed}'
+            keys = [hashlib.blake2b(np.ascontiguousarray(X[:, j]).tobytes(), digest_size=16).hexdigest() + suffix
+                    for j in range(len(columns))]
+            todo = [j for j, key in enumerate(keys) if key not in cache]
+            # Spread the columns over all workers, at most chunk_size per chunk
+            step = max(1, min(chunk_size, -(-len(todo) // n_workers)))
+            chunks = [todo[i:i + step] for i in range(0, len(todo), step)]
+            args = ([X[:, chunk] for chunk in chunks], [y] * len(chunks),
+                    [n_neighbors] * len(chunks), [seed] * len(chunks))
+            results = pool.map(_mutual_info_chunk, *args) if pool else map(_mutual_info_chunk, *args)
+            for chunk, chunk_scores in zip(chunks, results):
+                for j, score in zip(chunk, chunk_scores):
+                    cache[keys[j]] = score
+            
+            scores = pd.Series([cache[key] for key in keys], index=columns, dtype=float)
+            if previous is not None and (scores - previous).abs().max() <= tol:
+                break
+            if size >= max_sample_size:
+                break
+            # Doubling the sample at least doubles the kNN work of the next round
+            now = time.perf_counter()
+            if time_budget is not None and (now - start) + 2.5 * (now - round_start) > time_budget:
+                break
+            previous, size = scores, min(2 * size, max_sample_size)
+    finally:
+        if pool:
+            pool.shutdown()
+    return scores.sort_values(ascending=False)
+
 # Get top features by mutual informatio
-def get_mutual_info(data, target_col, n=10):
-    X = data.select_dtypes(include=np.number).drop(columns=[target_col]).fillna(0)
-    y = data[target_col]
-    mi = mutual_info_regression(X, y)
-    return pd.Series(mi, index=X.columns).sort_values(ascending=False).head(n)
+def get_mutual_info(data, target_col, n=10, **kwargs):
+    return rank_mutual_info(data, target_col, **kwargs).head(n)
 
 # 7. Main Pipeline
+# Keys/categories as a plain array for np.savez: numeric, bool and datetime
+# keys keep their dtype so they still match after load; others become str
+def _key_array(index):
+    values = index.to_numpy()
+    return values if values.dtype.kind in 'biufcmM' else values.astype(str)
+
+# Fitted feature pipeline: learns the city postal-code modes, one-hot
+# categories, target encodings, robust-scale parameters and customer
+# aggregates once, then applies them to new batches without refitting.
+# Inputs are never mutated; state is saved to a compressed .npz file.
+class FeaturePipeline:
+    
+    def __init__(self, target_col='Sales', encode_cols=('ShipMode', 'Segment', 'City'),
+                    max_one_hot=5, group_col='CustomerID'):
+        self.target_col = target_col
+        self.encode_cols = list(encode_cols)
+        self.max_one_hot = max_one_hot
+        self.group_col = group_col
+        self.state = None
+    
+    # Learn all statistics from training data
+    def fit(self, data):
+        self._run(data, fit=True)
+        return self
+    
+    # Learn statistics and return the transformed training data
+    def fit_transform(self, data):
+        return self._run(data, fit=True)
+    
+    # Apply learned statistics to a new batch
+    def transform(self, data):
+        if self.state is None:
+            raise ValueError("FeaturePipeline must be fitted before transform")
+        return self._run(data, fit=False)
+    
+    def _run(self, data, fit):
+        target = self.target_col
+        if fit:
+            self.state = {'one_hot': {}, 'target_encoding': {}}
+        state = self.state
+        
+        # 1. Clean data (rename returns a new frame, so the input is untouched)
+        data = clean_column_names(data.rename(columns=str))
+        if 'City' in data.columns and 'PostalCode' in data.columns:
+            if fit:
+                modes = data.dropna(subset=['PostalCode']).groupby('City')['PostalCode'].agg(
+                    lambda x: x.mode()[0])
+                state['postal_mode'] = modes
+            data['PostalCode'] = data['PostalCode'].fillna(
+                data['City'].map(state['postal_mode'])).fillna(0)
+        categoricals = data.select_dtypes(include=['object', 'string']).columns
+        data[categoricals] = data[categoricals].fillna('Unknown')
+        data = data.dropna()
+        
+        # 2. Create date features
+        data = create_date_features(data, {'OrderDate': 'Order', 'ShipDate': 'Ship'})
+        data = calculate_time_delta(data, 'OrderDate', 'ShipDate', 'ShippingDuration')
+        
+        # 3. Encode categoricals with the categories/encodings seen in fit
+        encode_cols = [col for col in self.encode_cols if col in data.columns]
+        if fit:
+            one_hot_cols = [col for col in encode_cols if data[col].nunique() < self.max_one_hot]
+            state['one_hot'] = SparseOneHotEncoder().fit(data, one_hot_cols).categories
+            for col in encode_cols:
+                if col not in one_hot_cols:
+                    state['target_encoding'][col] = TargetEncoder()
+        one_hot = {col: state['one_hot'][col] for col in encode_cols if col in state['one_hot']}
+        data = SparseOneHotEncoder(one_hot).encode_into(data)
+        for col in encode_cols:
+            if col in state['target_encoding']:
+                encoder = state['target_encoding'][col]
+                if fit:
+                    encoded = encoder.fit_transform(data[col], data[target])
+                else:
+                    encoded = encoder.transform(data[col])
+                data[f'TargetEnc_{col}'] = encoded
+        
+        # 4. Transform numericals
+        if target in data.columns:
+            if fit:
+                q1, q3 = data[target].quantile([0.25, 0.75])
+                state['robust'] = {'median': data[target].median(), 'iqr': q3 - q1}
+            data[f'Log_{target}'] = np.log1p(data[target])
+            data[f'Scaled_{target}'] = (data[target] - state['robust']['median']) / state['robust']['iqr']
+        
+        # 5. Create new features
+        if all(col in data.columns for col in [target, 'ShippingDuration']):
+            data = create_interaction(data, target, 'ShippingDuration', 'SalesPerDay')
+        
+        group = self.group_col
+        if group in data.columns:
+            agg_cols = [col for col in [target, 'ShippingDuration'] if col in data.columns]
+            if fit:
+                state['aggregates'] = aggregate_table(data, group, agg_cols)[0]
+            aggregates = state['aggregates']
+            rows = aggregates.index.get_indexer(data[group])
+            for name in aggregates.columns:
+                values = aggregates[name].to_numpy(dtype=float)
+                data[name] = np.where(rows >= 0, values[rows], np.nan)
+        
+        return data
+    
+    # Save fitted state to a compressed .npz (arrays + JSON header, no pickle)
+    def save(self, path):
+        state = self.state
+        arrays = {}
+        for name in ('postal_mode',):
+            if name in state:
+                arrays[f'{name}/index'] = _key_array(state[name].index)
+                arrays[f'{name}/values'] = state[name].to_numpy(dtype=float)
+        for col, categories in state['one_hot'].items():
+            arrays[f'one_hot/{col}'] = _key_array(categories)
+        for col, encoder in state['target_encoding'].items():
+            arrays[f'target_encoding/{col}/index'] = _key_array(encoder.categories)
+            arrays[f'target_encoding/{col}/values'] = encoder.encoding
+        if 'aggregates' in state:
+            arrays['aggregates/index'] = _key_array(state['aggregates'].index)
+            arrays['aggregates/values'] = state['aggregates'].to_numpy(dtype=float)
+        meta = {'params': {'target_col': self.target_col, 'encode_cols': self.encode_cols,
+                            'max_one_hot': self.max_one_hot, 'group_col': self.group_col},
+                'one_hot': list(state['one_hot']),
+                'target_encoding': {col: {'smoothing': encoder.smoothing, 'n_folds': encoder.n_folds,
+                                            'seed': encoder.seed, 'prior': encoder.prior}
+                                    for col, encoder in state['target_encoding'].items()},
+                'robust': state.get('robust'),
+                'aggregate_columns': list(state['aggregates'].columns) if 'aggregates' in state else None}
+        arrays['meta'] = np.array(json.dumps(meta, default=float))
+        np.savez_compressed(path, **arrays)
+    
+    # Load a pipeline saved with save()
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as archive:
+            meta = json.loads(str(archive['meta']))
+            pipeline = cls(**meta['params'])
+            state = {'one_hot': {}, 'target_encoding': {}}
+            if 'postal_mode/index' in archive:
+                state['postal_mode'] = pd.Series(archive['postal_mode/values'],
+                                                    index=archive['postal_mode/index'])
+            for col in meta['one_hot']:
+                state['one_hot'][col] = pd.Index(archive[f'one_hot/{col}'])
+            for col, params in meta['target_encoding'].items():
+                encoder = TargetEncoder(params['smoothing'], params['n_folds'], params['seed'])
+                encoder.categories = pd.Index(archive[f'target_encoding/{col}/index'])
+                encoder.encoding = archive[f'target_encoding/{col}/values']
+                encoder.prior = params['prior']
+                state['target_encoding'][col] = encoder
+            if meta['robust'] is not None:
+                state['robust'] = meta['robust']
+            if meta['aggregate_columns'] is not None:
+                state['aggregates'] = pd.DataFrame(archive['aggregates/values'],
+                                                    index=archive['aggregates/index'],
+                                                    columns=meta['aggregate_columns'])
+        pipeline.state = state
+        return pipeline
+
 # Complete feature engineering pipelin
 def run_feature_pipeline(data, target_col='Sales'):
     # 1. Clean data
@@ -116,13 +506,13 @@ def run_feature_pipeline(data, target_col='Sales'):
     data = create_date_features(data, {'OrderDate': 'Order', 'ShipDate': 'Ship'})
     data = calculate_time_delta(data, 'OrderDate', 'ShipDate', 'ShippingDuration')
     
-    # 3. Encode categoricals
-    for col in ['ShipMode', 'Segment', 'City']:
-        if col in data.columns:
-            if data[col].nunique() < 5:
-                data = one_hot_encode(data, col)
-            else:
-                data = target_encode(data, col, target_col)
+    # 3. Encode categoricals (low-cardinality columns one-hot in one call)
+    encode_cols = [col for col in ['ShipMode', 'Segment', 'City'] if col in data.columns]
+    one_hot_cols = [col for col in encode_cols if data[col].nunique() < 5]
+    data = one_hot_encode(data, one_hot_cols)
+    for col in encode_cols:
+        if col not in one_hot_cols:
+            data = target_encode(data, col, target_col)
     
     # 4. Transform numericals
     if target_col in data.columns:
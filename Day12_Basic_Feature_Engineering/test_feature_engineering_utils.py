@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from feature_engineering_utils import (FeaturePipeline, SparseOneHotEncoder, one_hot_encode,
+                                        rank_mutual_info, get_mutual_info)
+
+
+# Numeric frame whose feature columns all share one float block
+def make_float_frame(n_rows=2000, n_cols=6, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, n_cols))
+    X[::7, 1] = np.nan
+    data = pd.DataFrame(X, columns=[f'f{i}' for i in range(n_cols)])
+    data['t'] = 2 * X[:, 0] + rng.normal(size=n_rows)
+    return data
+
+
+# Raw Superstore-style orders with numeric customer, segment and city keys
+def make_orders(n_rows=600, seed=0):
+    rng = np.random.default_rng(seed)
+    order_dates = pd.Timestamp('2017-01-01') + pd.to_timedelta(rng.integers(0, 700, n_rows), unit='D')
+    ship_dates = order_dates + pd.to_timedelta(rng.integers(0, 7, n_rows), unit='D')
+    return pd.DataFrame({
+        'Order Date': order_dates.strftime('%d/%m/%Y'),
+        'Ship Date': ship_dates.strftime('%d/%m/%Y'),
+        'Ship Mode': rng.choice(['Standard Class', 'Second Class', 'Same Day'], n_rows),
+        'Customer ID': rng.integers(100, 160, n_rows),
+        'Segment': rng.integers(1, 4, n_rows),
+        'City': rng.integers(0, 40, n_rows),
+        'Sales': rng.lognormal(4, 1, n_rows),
+    })
+
+
+def test_feature_pipeline_round_trip_numeric_keys(tmp_path):
+    pipeline = FeaturePipeline().fit(make_orders())
+    path = tmp_path / 'pipeline.npz'
+    pipeline.save(path)
+    loaded = FeaturePipeline.load(path)
+    
+    batch = make_orders(200, seed=1)
+    expected = pipeline.transform(batch)
+    result = loaded.transform(batch)
+    pd.testing.assert_frame_equal(result, expected)
+    assert expected['CustomerID_Sales_mean'].notna().all()
+    assert expected.filter(like='Segment_').to_numpy().any()
+
+
+def test_one_hot_encode_high_cardinality():
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({'Code': rng.integers(0, 3000, 20000).astype(str), 'Value': rng.random(20000)})
+    encoded = one_hot_encode(data, 'Code')
+    
+    dense = pd.get_dummies(data['Code'], prefix='Code')
+    assert list(encoded.columns[2:]) == list(dense.columns)
+    assert (encoded[dense.columns].sparse.to_coo().tocsr() != sparse.csr_matrix(dense.to_numpy())).nnz == 0
+    assert np.shares_memory(encoded['Value'].to_numpy(), data['Value'].to_numpy())
+
+
+def test_one_hot_unseen_categories():
+    encoder = SparseOneHotEncoder().fit(pd.DataFrame({'c': ['a', 'b']}), 'c')
+    matrix = encoder.transform(pd.DataFrame({'c': ['b', 'z', None]}))
+    np.testing.assert_array_equal(matrix.toarray(), [[False, True], [False, False], [False, False]])
+
+
+def test_mutual_info_all_float_frame():
+    data = make_float_frame()
+    top = get_mutual_info(data, 't', n=3, sample_size=500, max_sample_size=500, cache=None)
+    assert top.index[0] == 'f0'
+    assert len(top) == 3
+
+
+def test_mutual_info_parallel_matches_serial():
+    data = make_float_frame()
+    serial = rank_mutual_info(data, 't', sample_size=500, max_sample_size=500, cache=None)
+    parallel = rank_mutual_info(data, 't', sample_size=500, max_sample_size=500,
+                                n_workers=2, cache=None)
+    pd.testing.assert_series_equal(serial, parallel)